@@ -1,63 +1,114 @@
-import gradio as gr
-import requests
 import json
+import os
+
+import aiofiles
+import aiohttp
+import gradio as gr
+
+EXTRACT_API_URL = 'http://localhost:8002/api/extract/'
+UPLOAD_CHUNK_SIZE = 64 * 1024
 
+# Shared aiohttp session, created lazily on Gradio's event loop so uploads reuse keep-alive connections
+_session = None
 
-def extract_text_data(file):
+
+async def get_session():
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(limit=16, keepalive_timeout=30)
+        _session = aiohttp.ClientSession(connector=connector)
+    return _session
+
+
+async def read_file_chunks(file_path):
     """
-    Extract data from uploaded resume using the existing API endpoint
+    Stream the file from disk without blocking the event loop
     """
-    if file is None:
-        return {"error": "No file uploaded"}
-
-    try:
-        # Prepare multipart/form-data payload
-        with open(file.name, 'rb') as f:
-            files = {'file': f}
-            form_data = {
-                'data_schema_key': 'company_registration',
-                'case_type': 'registration',
-                'case_sub_type': 'company',
-                'user_id': 'current_user'
-            }
+    async with aiofiles.open(file_path, 'rb') as f:
+        while chunk := await f.read(UPLOAD_CHUNK_SIZE):
+            yield chunk
 
-            # Make API call to extract endpoint
-            response = requests.post('http://localhost:8002/api/extract/',
-                                     files=files,
-                                     data=form_data)
 
-            # Check if request was successful
-            response.raise_for_status()
+def build_extract_handler(*, schema_key, case_type, case_sub_type, user_id='current_user'):
+    """
+    Build an upload handler that extracts data for the given schema using the existing API endpoint
+    """
+    # Form fields are fixed per interface, so build them once instead of on every upload
+    form_fields = (
+        ('data_schema_key', schema_key),
+        ('case_type', case_type),
+        ('case_sub_type', case_sub_type),
+        ('user_id', user_id),
+    )
+
+    async def extract_data(file):
+        if file is None:
+            return {"error": "No file uploaded"}
+
+        try:
+            # Prepare multipart/form-data payload
+            data = aiohttp.FormData()
+            data.add_field('file', read_file_chunks(file.name), filename=os.path.basename(file.name))
+            for name, value in form_fields:
+                data.add_field(name, value)
+
+            # Make API call to extract endpoint
+            session = await get_session()
+            async with session.post(EXTRACT_API_URL, data=data) as response:
+                # Check if request was successful
+                response.raise_for_status()
 
-            # Parse JSON response
-            response_json = response.json()
+                # Parse JSON response
+                response_json = await response.json()
 
             # Return the extracted form data or a descriptive error
             extracted_data = response_json.get('extracted_form_data', {})
 
             return extracted_data if extracted_data else {"error": "No data extracted"}
 
-    except requests.RequestException as e:
-        return {"error": f"API Request Error: {str(e)}"}
-    except json.JSONDecodeError:
-        return {"error": "Invalid JSON response from server"}
-    except Exception as e:
-        return {"error": f"Unexpected error: {str(e)}"}
+        except aiohttp.ClientError as e:
+            return {"error": f"API Request Error: {str(e)}"}
+        except json.JSONDecodeError:
+            return {"error": "Invalid JSON response from server"}
+        except Exception as e:
+            return {"error": f"Unexpected error: {str(e)}"}
 
+    return extract_data
 
-# Create Gradio interface
-def data_analyzer_interface():
+
+def build_interface(*, schema_key, case_type, case_sub_type, title, description):
+    """
+    Create a Gradio interface bound to a single form schema
+    """
     interface = gr.Interface(
-        fn=extract_text_data,
+        fn=build_extract_handler(schema_key=schema_key, case_type=case_type, case_sub_type=case_sub_type),
         inputs=gr.File(type="filepath", label="Upload Document (PDF/Image)"),
         outputs=gr.JSON(label="Extracted Form Data"),
+        title=title,
+        description=description
+    )
+    return interface
+
+
+extract_text_data = build_extract_handler(
+    schema_key='company_registration',
+    case_type='registration',
+    case_sub_type='company'
+)
+
+
+# Create Gradio interface
+def data_analyzer_interface():
+    return build_interface(
+        schema_key='company_registration',
+        case_type='registration',
+        case_sub_type='company',
         title="SilTextBridge",
         description="Upload a document to extract structured data"
     )
-    return interface
 
 
 # Launch the interface
 if __name__ == "__main__":
     demo = data_analyzer_interface()
-    demo.launch()
\ No newline at end of file
+    demo.launch()
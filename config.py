@@ -0,0 +1,59 @@
+from functools import lru_cache
+from typing import Optional
+
+from dotenv import load_dotenv
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+# Load .env once for the whole process, so libraries that read the environment
+# directly (boto3, openai) see the same values as the settings below
+load_dotenv()
+
+
+class Settings(BaseSettings):
+    """Service configuration, read once from the environment and frozen."""
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore", frozen=True)
+
+    app_name: Optional[str] = None
+    env: Optional[str] = None
+
+    # AWS
+    aws_access_key_id: Optional[str] = None
+    aws_secret_access_key: Optional[str] = None
+    aws_region: Optional[str] = None
+    s3_form_bucket: Optional[str] = None
+    s3_data_schema_bucket: Optional[str] = None
+    s3_upload_concurrency: int = 10
+    textract_concurrency: int = 5
+    textract_start_rate: float = 2.0  # StartDocumentAnalysis calls per second, per process
+    textract_max_open_jobs: int = 100  # Asynchronous Textract jobs open at once, per process
+    # "blake3" or any hashlib algorithm name. Content hashes key the Redis caches and the
+    # stored form objects, so changing this makes previously stored hashes unreachable
+    file_hash_algo: str = "blake3"
+    # When all three are set, Textract reports job completion over SNS -> SQS
+    # instead of being polled
+    textract_sns_topic_arn: Optional[str] = None
+    textract_role_arn: Optional[str] = None
+    textract_sqs_queue_url: Optional[str] = None
+
+    # Redis
+    redis_host: str = "localhost"
+    redis_port: int = 6379
+    redis_db: int = 0
+
+    # OpenAI
+    openai_api_key: Optional[str] = None
+
+    # Server
+    host: str = "127.0.0.1"
+    port: int = 8002
+    web_concurrency: Optional[int] = None
+    preload_schema_keys: str = ""  # Comma-separated; empty means every known key
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    return Settings()
+
+
+settings = get_settings()
@@ -1,34 +1,52 @@
-import json
-import os
-import time
+import argparse
+import asyncio
+import hashlib
+import logging
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from datetime import datetime
+from functools import cached_property, lru_cache
 from typing import Optional
 
-from dotenv import load_dotenv
+import httpx
+import openai
+import orjson
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_openai import ChatOpenAI
-from pydantic import BaseModel, ValidationError
-
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from tenacity import (
+    AsyncRetrying,
+    Retrying,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
+
+from config import settings
 from logger import configured_logger
+from redis_facade import redis_client
 from s3_facade import s3
 from utils import validate_output
 
-load_dotenv()
 
-# Load API key from environment variables
-api_key = os.getenv("OPENAI_API_KEY")
 
-from models import FormDataSchema, Resume, Card, CompanyRegistration
+# Leaf types that are already JSON-compatible; checked by exact type before the isinstance chain
+_ATOMIC_TYPES = frozenset({str, int, float, bool, type(None)})
 
 
-class CustomJSONEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        elif isinstance(obj, BaseModel):
-            return obj.model_dump()
-        return super().default(obj)
+def _normalize(obj):
+    """Convert datetimes and nested models into JSON-compatible values in a single pass."""
+    if type(obj) in _ATOMIC_TYPES:
+        return obj
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, dict):
+        return {key: _normalize(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [_normalize(item) for item in obj]
+    return obj
 
 
 class LLMProcessingError(Exception):
@@ -51,23 +69,175 @@ class ResponseFormatStrategy(ABC):
         """Serialize the LLM response based on the chosen strategy."""
         pass
 
+    @abstractmethod
+    def cache_key(self):
+        """Hashable key identifying the structured output this strategy configures."""
+        pass
+
+    async def aprefetch(self):
+        """Fetch anything prepare_llm needs over the network, without blocking the event loop."""
+        pass
+
+
+SCHEMA_CACHE_TTL = 3600
+
+
+def _schema_cache_key(schema_file: str) -> str:
+    return f"schema:{schema_file}"
+
+
+# Parsed schemas per schema file, shared by the sync and async loaders
+_SCHEMA_CACHE = {}
+
+# Content fingerprints per schema file, computed once per loaded schema
+_SCHEMA_FINGERPRINTS = {}
+
+
+def _schema_fingerprint(schema: dict) -> str:
+    """Short, constant-size hash of the schema's canonical JSON form."""
+    canonical_schema = orjson.dumps(schema, option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(canonical_schema, digest_size=16).hexdigest()
+
+
+def _get_cached_schema(schema_file: str) -> Optional[dict]:
+    """Look the schema up in Redis; None on a miss or if Redis is unavailable."""
+    try:
+        cached_schema = redis_client.get_cache(_schema_cache_key(schema_file))
+        if cached_schema is not None:
+            return orjson.loads(cached_schema)
+    except Exception as e:
+        configured_logger.warning("Schema cache lookup failed for '%s': %s", schema_file, e)
+    return None
+
+
+async def _aget_cached_schema(schema_file: str) -> Optional[dict]:
+    try:
+        cached_schema = await redis_client.aget_cache(_schema_cache_key(schema_file))
+        if cached_schema is not None:
+            return orjson.loads(cached_schema)
+    except Exception as e:
+        configured_logger.warning("Schema cache lookup failed for '%s': %s", schema_file, e)
+    return None
+
+
+def _parse_schema(schema_file: str, schema_content: bytes) -> dict:
+    configured_logger.debug("Loaded schema '%s' (%d bytes)", schema_file, len(schema_content))
+
+    # orjson parses the raw bytes directly
+    return orjson.loads(schema_content)
+
+
+def _cache_schema(schema_file: str, schema_content: bytes) -> dict:
+    """Parse a schema downloaded from S3 and share it with other workers through Redis."""
+    json_schema = _parse_schema(schema_file, schema_content)
+    try:
+        redis_client.set_cache(
+            _schema_cache_key(schema_file), schema_content.decode("utf-8"), ttl=SCHEMA_CACHE_TTL
+        )
+    except Exception as e:
+        configured_logger.warning("Could not cache schema '%s': %s", schema_file, e)
+    return json_schema
+
+
+async def _acache_schema(schema_file: str, schema_content: bytes) -> dict:
+    json_schema = _parse_schema(schema_file, schema_content)
+    try:
+        await redis_client.aset_cache(
+            _schema_cache_key(schema_file), schema_content.decode("utf-8"), ttl=SCHEMA_CACHE_TTL
+        )
+    except Exception as e:
+        configured_logger.warning("Could not cache schema '%s': %s", schema_file, e)
+    return json_schema
+
+
+def _load_schema(schema_file: str) -> dict:
+    """Load a JSON schema from the process cache, then Redis, then S3."""
+    json_schema = _SCHEMA_CACHE.get(schema_file)
+    if json_schema is None:
+        json_schema = _get_cached_schema(schema_file)
+        if json_schema is None:
+            json_schema = _cache_schema(schema_file, s3.download_schema(schema_file))
+        _SCHEMA_CACHE[schema_file] = json_schema
+    return json_schema
+
+
+async def _aload_schema(schema_file: str) -> dict:
+    """Async variant of _load_schema that downloads from S3 without blocking the event loop."""
+    json_schema = _SCHEMA_CACHE.get(schema_file)
+    if json_schema is None:
+        json_schema = await _aget_cached_schema(schema_file)
+        if json_schema is None:
+            schema_content = await s3.download_schema_async(schema_file)
+            json_schema = await _acache_schema(schema_file, schema_content)
+        _SCHEMA_CACHE[schema_file] = json_schema
+    return json_schema
+
+
+# Workers drop their in-process copies of a schema when its file name is published here
+SCHEMA_INVALIDATION_CHANNEL = "schema-invalidation"
+
+
+def _drop_local_schema(schema_file: str):
+    _SCHEMA_CACHE.pop(schema_file, None)
+    _SCHEMA_FINGERPRINTS.pop(schema_file, None)
+    _PREPARED_LLMS.clear()
+
+
+def clear_schema_cache(schema_file: str):
+    """Drop cached copies of a schema in every worker so the next request picks up the freshly uploaded one."""
+    redis_client.delete_cache(_schema_cache_key(schema_file))
+    _drop_local_schema(schema_file)
+    try:
+        redis_client.publish(SCHEMA_INVALIDATION_CHANNEL, schema_file)
+    except Exception as e:
+        configured_logger.warning("Could not notify other workers about schema '%s': %s", schema_file, e)
+
+
+async def aclear_schema_cache(schema_file: str):
+    """Async variant of clear_schema_cache for use from request handlers."""
+    await redis_client.adelete_cache(_schema_cache_key(schema_file))
+    _drop_local_schema(schema_file)
+    try:
+        await redis_client.apublish(SCHEMA_INVALIDATION_CHANNEL, schema_file)
+    except Exception as e:
+        configured_logger.warning("Could not notify other workers about schema '%s': %s", schema_file, e)
+
+
+async def listen_for_schema_invalidations():
+    """Drop local schema caches whenever another worker publishes an invalidation; runs until cancelled."""
+    while True:
+        try:
+            async with redis_client.async_pubsub() as pubsub:
+                await pubsub.subscribe(SCHEMA_INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    configured_logger.info("Schema '%s' changed; dropping cached copy", message["data"])
+                    _drop_local_schema(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Whatever was missed while disconnected may be stale, so start from scratch
+            configured_logger.warning("Schema invalidation listener disconnected: %s", e)
+            _SCHEMA_CACHE.clear()
+            _SCHEMA_FINGERPRINTS.clear()
+            _PREPARED_LLMS.clear()
+            await asyncio.sleep(5)
+
 
 # JSON Schema Strategy
 class JsonSchemaStrategy(ResponseFormatStrategy):
     def __init__(self, schema_file: str):
         self.schema_file = schema_file
+        self._json_schema = None
+
+    def _schema(self) -> dict:
+        # The copy aprefetch loaded stays usable even if an invalidation clears the shared caches
+        if self._json_schema is None:
+            self._json_schema = _load_schema(self.schema_file)
+        return self._json_schema
 
     def prepare_llm(self, llm: ChatOpenAI):
         try:
-            # Download schema from S3
-            schema_content = s3.download_schema(self.schema_file)
-
-            # Assuming the schema content is JSON, you can load it into a Python object
-            json_schema = json.loads(
-                schema_content.decode("utf-8")
-            )  # Decode bytes to string if necessary
-
-            print(schema_content)
+            json_schema = self._schema()
 
             # Configure the LLM with the schema
             return llm.with_structured_output(json_schema)
@@ -77,14 +247,22 @@ class JsonSchemaStrategy(ResponseFormatStrategy):
                 f"Error preparing LLM with schema '{self.schema_file}' -> {e}"
             )
 
+    async def aprefetch(self):
+        self._json_schema = await _aload_schema(self.schema_file)
+
+    def cache_key(self):
+        # Keyed by content, so schema files with identical schemas share one bound runnable
+        fingerprint = _SCHEMA_FINGERPRINTS.get(self.schema_file)
+        if fingerprint is None:
+            fingerprint = _SCHEMA_FINGERPRINTS[self.schema_file] = _schema_fingerprint(
+                self._schema()
+            )
+        return "json", fingerprint
+
     def serialize_response(self, response):
         try:
-            # Serialize the response using a custom JSON encoder
-            serialized_response = json.dumps(response, cls=CustomJSONEncoder)
-            # Optionally load it back into a JSON object (if required)
-            return json.loads(serialized_response)
-        except (TypeError, json.JSONDecodeError) as e:
-            raise e
+            # Walk the response once instead of dumping it to a string and parsing it back
+            return _normalize(response)
         except Exception as e:
             # Handle any other unexpected errors
             raise ValueError(
@@ -92,6 +270,10 @@ class JsonSchemaStrategy(ResponseFormatStrategy):
             )
 
 
+# Serializes dict responses (e.g. with nested models) to JSON-ready values in one compiled pass
+_DICT_ADAPTER = TypeAdapter(dict)
+
+
 # Pydantic Model Strategy
 class PydanticModelStrategy(ResponseFormatStrategy):
     def __init__(self, pydantic_model: BaseModel):
@@ -100,23 +282,17 @@ class PydanticModelStrategy(ResponseFormatStrategy):
     def prepare_llm(self, llm: ChatOpenAI):
         return llm.with_structured_output(self.pydantic_model)
 
+    def cache_key(self):
+        return "pydantic", self.pydantic_model
+
     def serialize_response(self, response):
         try:
-            # Convert Pydantic models to dicts
+            # Convert Pydantic models to JSON-ready dicts in pydantic-core rather than in Python
             if isinstance(response, BaseModel):
-                return response.model_dump()
+                return response.model_dump(mode="json")
             elif isinstance(response, dict):
-                # Handle nested Pydantic models
-                def serialize(obj):
-                    if isinstance(obj, BaseModel):
-                        return obj.model_dump()
-                    elif isinstance(obj, list):
-                        return [serialize(item) for item in obj]
-                    elif isinstance(obj, dict):
-                        return {key: serialize(value) for key, value in obj.items()}
-                    return obj
-
-                return serialize(response)
+                # Nested Pydantic models are serialized by type inference in the same pass
+                return _DICT_ADAPTER.dump_python(response, mode="json")
             else:
                 raise TypeError("Response type not supported for serialization")
 
@@ -135,36 +311,148 @@ class PydanticModelStrategy(ResponseFormatStrategy):
             raise Exception(f"Unexpected error during serialization -> {str(e)}")
 
 
+@lru_cache(maxsize=4)
+def _chat_model(model: str) -> ChatOpenAI:
+    """Shared ChatOpenAI per model so its keep-alive connection pool outlives a single request."""
+    limits = httpx.Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=60)
+    return ChatOpenAI(
+        model=model,
+        api_key=settings.openai_api_key,
+        http_client=httpx.Client(limits=limits),
+        http_async_client=httpx.AsyncClient(limits=limits),
+    )
+
+
+# Errors worth another attempt: rate limits, dropped connections, server hiccups and malformed output
+RETRIABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+    ValidationError,
+)
+
+# Serialized responses are reused for identical requests for a day
+RESPONSE_CACHE_TTL = 24 * 3600
+
+# Structured-output runnables keyed by (model, strategy cache key)
+_PREPARED_LLMS = {}
+
+
+def _prepared_llm(model: str, strategy: ResponseFormatStrategy):
+    """Bind the strategy's structured output to the shared model once and reuse it."""
+    key = (model, strategy.cache_key())
+    llm = _PREPARED_LLMS.get(key)
+    if llm is None:
+        llm = _PREPARED_LLMS[key] = strategy.prepare_llm(_chat_model(model))
+    return llm
+
+
 # LLM Client with Strategy Support
 class LLMClient:
     def __init__(self, model: str, strategy: ResponseFormatStrategy):
         self.model = model
         self.strategy = strategy
-        self.llm = ChatOpenAI(model=model)
         self.max_retries = 3
         self.retry_delay = 2
 
+    @cached_property
+    def llm(self):
+        # Bound on first use and kept, so a client can be reused across requests
+        return _prepared_llm(self.model, self.strategy)
+
     def prepare_llm(self):
-        self.llm = self.strategy.prepare_llm(self.llm)
+        return self.llm
+
+    async def aprepare_llm(self):
+        # Once the strategy's inputs are fetched, binding is cheap and safe to do on the loop
+        await self.strategy.aprefetch()
+        self.prepare_llm()
+
+    def _log_retry(self, retry_state):
+        # One line per retry; the traceback is logged once if processing finally fails
+        configured_logger.warning(
+            "Attempt %d failed: %s", retry_state.attempt_number, retry_state.outcome.exception()
+        )
+
+    def _invoke_once(self, messages):
+        response = self.llm.invoke(messages)
+        serialized = self.strategy.serialize_response(response)
+
+        validate_output(serialized)
+        return serialized
+
+    def _retry_policy(self, retrying_cls=Retrying):
+        # Only transient failures are retried, with jittered exponential backoff;
+        # anything else (auth, bad request) fails on the first attempt
+        return retrying_cls(
+            stop=stop_after_attempt(self.max_retries),
+            wait=wait_exponential_jitter(initial=self.retry_delay, max=20),
+            retry=retry_if_exception_type(RETRIABLE_ERRORS),
+            before_sleep=self._log_retry,
+            reraise=True,
+        )
 
     def invoke(self, messages):
-        for attempt in range(self.max_retries):
-            try:
-                response = self.llm.invoke(messages)
-                serialized = self.strategy.serialize_response(response)
-
-                validate_output(serialized)
-                return serialized
-            except ValidationError as ve:
-                configured_logger.error(f"Validation error: {str(ve)}")
-                if attempt == self.max_retries - 1:
-                    raise LLMProcessingError("Validation failed for LLM response", ve)
-            except Exception as e:
-                configured_logger.error(f"Attempt {attempt + 1} failed: {str(e)}")
-                if attempt == self.max_retries - 1:
-                    raise LLMProcessingError("Max retries exceeded", e)
-
-                time.sleep(self.retry_delay * (attempt + 1))
+        try:
+            for attempt in self._retry_policy():
+                with attempt:
+                    return self._invoke_once(messages)
+        except ValidationError as ve:
+            configured_logger.error(f"Validation error: {str(ve)}")
+            raise LLMProcessingError("Validation failed for LLM response", ve)
+        except Exception as e:
+            raise LLMProcessingError("LLM invocation failed", e)
+
+    async def _ainvoke_once(self, messages):
+        response = await self.llm.ainvoke(messages)
+        serialized = self.strategy.serialize_response(response)
+
+        validate_output(serialized)
+        return serialized
+
+    def response_cache_key(self, messages) -> str:
+        """Redis key for the response to these messages under this model and output format."""
+        kind, output_format = self.strategy.cache_key()
+        digest = hashlib.sha256()
+        digest.update(f"{self.model}\0{kind}:{getattr(output_format, '__qualname__', output_format)}".encode())
+        for message in messages:
+            digest.update(b"\0")
+            digest.update(message.content.encode())
+        return f"llm_response:{digest.hexdigest()}"
+
+    async def ainvoke_cached(self, messages) -> orjson.Fragment:
+        """
+        ainvoke, memoized in Redis as serialized JSON.
+
+        A hit is returned as an orjson Fragment, so the cached bytes are embedded in
+        the HTTP response as-is instead of being parsed and re-serialized.
+        """
+        cache_key = self.response_cache_key(messages)
+        try:
+            cached_response = await redis_client.aget_cache(cache_key)
+            if cached_response is not None:
+                configured_logger.info("Returning cached LLM response")
+                return orjson.Fragment(cached_response)
+        except Exception as e:
+            configured_logger.warning("Response cache lookup failed: %s", e)
+
+        serialized = orjson.dumps(await self.ainvoke(messages))
+        try:
+            await redis_client.aset_cache(cache_key, serialized.decode("utf-8"), RESPONSE_CACHE_TTL)
+        except Exception as e:
+            configured_logger.warning("Could not cache LLM response: %s", e)
+        return orjson.Fragment(serialized)
+
+    async def ainvoke(self, messages):
+        try:
+            async for attempt in self._retry_policy(AsyncRetrying):
+                with attempt:
+                    return await self._ainvoke_once(messages)
+        except ValidationError as ve:
+            configured_logger.error(f"Validation error: {str(ve)}")
+            raise LLMProcessingError("Validation failed for LLM response", ve)
+        except Exception as e:
+            raise LLMProcessingError("LLM invocation failed", e)
 
             # Static Case Details
 
@@ -181,14 +469,120 @@ static_case_details = {
     "ocdIsEditable": False,
 }
 
+LLM_MODEL = "gpt-4o-mini"
+
+# Messages are never mutated downstream, so the constant system prompt is built once
+_EXTRACT_SYSTEM_MSG = SystemMessage(content="Extract the form data.")
+
+# Pydantic model per schema key, by name: models is only imported once a Pydantic strategy is needed
 DATA_SCHEMA_MAPPER = {
-    'resume': Resume,
-    'card': Card,
-    'registration_for_ngo_npo': FormDataSchema,
-    'company_registration': CompanyRegistration,
+    'resume': 'Resume',
+    'card': 'Card',
+    'registration_for_ngo_npo': 'FormDataSchema',
+    'company_registration': 'CompanyRegistration',
 }
 
 
+@lru_cache(maxsize=None)
+def _resolve_schema_model(data_schema_key: str):
+    import models
+
+    return getattr(models, DATA_SCHEMA_MAPPER[data_schema_key])
+
+
+def _create_llm_client(data_schema_key: str, use_pydantic: bool, input_content: str) -> LLMClient:
+    # Validate input content
+    if input_content is None:
+        raise ValueError(
+            "Input content must be provided. input_content cannot be None."
+        )
+
+    configured_logger.info(f"Processing form data for schema: {data_schema_key}")
+    if configured_logger.isEnabledFor(logging.DEBUG):
+        configured_logger.debug("Input content: %s...", input_content[:200])  # Log first 200 chars
+
+    # Initialize LLM client with the chosen strategy
+    return LLMClient(model=LLM_MODEL, strategy=_create_strategy(data_schema_key, use_pydantic))
+
+
+def _create_strategy(data_schema_key: str, use_pydantic: bool) -> ResponseFormatStrategy:
+    # Choose strategy based on input
+    if use_pydantic:
+        return PydanticModelStrategy(_resolve_schema_model(data_schema_key))
+    return JsonSchemaStrategy(f"{data_schema_key}.json")
+
+
+async def aprepare_form_llm(data_schema_key: str, use_pydantic: bool = False):
+    """
+    Load the schema and bind the structured output for a form ahead of its input being ready.
+
+    Failures are only logged; processing the form reports them properly.
+    """
+    try:
+        await LLMClient(model=LLM_MODEL, strategy=_create_strategy(data_schema_key, use_pydantic)).aprepare_llm()
+    except Exception as e:
+        configured_logger.warning("Could not prepare LLM for schema '%s': %s", data_schema_key, e)
+
+
+async def awarm_prepared_llms(data_schema_keys=None):
+    """
+    Bind the structured output for each schema key ahead of the first request.
+
+    Warms both the JSON schema and the Pydantic strategy; keys whose schema cannot be
+    loaded are logged and left to be prepared on demand.
+    """
+    data_schema_keys = list(data_schema_keys or DATA_SCHEMA_MAPPER)
+    llm_clients = [
+        LLMClient(model=LLM_MODEL, strategy=JsonSchemaStrategy(f"{key}.json"))
+        for key in data_schema_keys
+    ]
+    llm_clients += [
+        LLMClient(model=LLM_MODEL, strategy=PydanticModelStrategy(_resolve_schema_model(key)))
+        for key in data_schema_keys
+        if key in DATA_SCHEMA_MAPPER
+    ]
+
+    results = await asyncio.gather(
+        *(llm_client.aprepare_llm() for llm_client in llm_clients),
+        return_exceptions=True,
+    )
+    for llm_client, result in zip(llm_clients, results):
+        if isinstance(result, Exception):
+            configured_logger.warning(
+                "Could not warm %s: %s", type(llm_client.strategy).__name__, result
+            )
+    configured_logger.info(
+        "Prepared %d structured-output runnables for %d schema keys",
+        len(_PREPARED_LLMS),
+        len(data_schema_keys),
+    )
+
+
+def _extraction_messages(input_content: str):
+    return [_EXTRACT_SYSTEM_MSG, HumanMessage(content=input_content)]
+
+
+@contextmanager
+def _processing_errors():
+    """Log failures and surface them as LLMProcessingError."""
+    try:
+        yield
+
+    except LLMProcessingError as lpe:
+        configured_logger.error(f"LLM Processing failed: {str(lpe)}")
+        if lpe.original_error:
+            configured_logger.error(f"Original error: {str(lpe.original_error)}")
+        raise
+
+    except ValidationError as ve:
+        configured_logger.error(f"Data validation error: {str(ve)}")
+        raise LLMProcessingError("Data validation failed", ve)
+
+    except Exception as e:
+        configured_logger.exception("Processing failed")
+        raise LLMProcessingError("Processing failed", e)
+
+
 def process_form_data(
         data_schema_key: str = None, use_pydantic: bool = False, input_content: str = None
 ):
@@ -202,65 +596,74 @@ def process_form_data(
     :raises ValueError: If input_content is None
     """
 
-    try:
-        # Validate input content
-        if input_content is None:
-            raise ValueError(
-                "Input content must be provided. input_content cannot be None."
-            )
+    with _processing_errors():
+        llm_client = _create_llm_client(data_schema_key, use_pydantic, input_content)
+
+        # Prepare the LLM with the chosen strategy
+        llm_client.prepare_llm()
 
-        configured_logger.info(f"Processing form data for schema: {data_schema_key}")
-        configured_logger.debug(f"Input content: {input_content[:200]}...")  # Log first 200 chars
+        # Send messages
+        return llm_client.invoke(_extraction_messages(input_content))
 
-        # Choose strategy based on input
-        if use_pydantic:
-            strategy = PydanticModelStrategy(DATA_SCHEMA_MAPPER[data_schema_key])
-        else:
-            strategy = JsonSchemaStrategy(f"{data_schema_key}.json")
 
-        # Initialize LLM client with the chosen strategy
-        llm_client = LLMClient(model="gpt-4o-mini", strategy=strategy)
+async def aprocess_form_data(
+        data_schema_key: str = None, use_pydantic: bool = False, input_content: str = None
+):
+    """
+    Async variant of process_form_data that awaits the LLM instead of blocking the event loop.
+
+    :param data_schema_key: String serves as key for schema file in s3
+    :param use_pydantic: Boolean to choose between Pydantic and JSON Schema strategy
+    :param input_content: Input content for form processing
+    :return: Processed form data
+    :raises ValueError: If input_content is None
+    """
+
+    with _processing_errors():
+        llm_client = _create_llm_client(data_schema_key, use_pydantic, input_content)
 
         # Prepare the LLM with the chosen strategy
-        llm_client.prepare_llm()
+        await llm_client.aprepare_llm()
 
         # Send messages
-        response = llm_client.invoke(
-            [
-                SystemMessage(content="Extract the form data."),
-                HumanMessage(content=input_content),
-            ]
-        )
+        return await llm_client.ainvoke(_extraction_messages(input_content))
 
-        # Convert response to JSON string
-        return response
 
-    except LLMProcessingError as lpe:
-        configured_logger.error(f"LLM Processing failed: {str(lpe)}")
-        if lpe.original_error:
-            configured_logger.error(f"Original error: {str(lpe.original_error)}")
-        raise
+async def aprocess_form_data_cached(
+        data_schema_key: str = None, use_pydantic: bool = False, input_content: str = None
+) -> orjson.Fragment:
+    """
+    aprocess_form_data, returning serialized JSON that is cached in Redis for identical requests.
 
-    except ValidationError as ve:
-        configured_logger.error(f"Data validation error: {str(ve)}")
-        raise LLMProcessingError("Data validation failed", ve)
+    :param data_schema_key: String serves as key for schema file in s3
+    :param use_pydantic: Boolean to choose between Pydantic and JSON Schema strategy
+    :param input_content: Input content for form processing
+    :return: Processed form data as an orjson Fragment, ready to embed in an ORJSONResponse
+    :raises ValueError: If input_content is None
+    """
 
-    except Exception as e:
-        configured_logger.error(f"Unexpected error: {str(e)}", exc_info=True)
-        raise LLMProcessingError("Processing failed", e)
+    with _processing_errors():
+        llm_client = _create_llm_client(data_schema_key, use_pydantic, input_content)
+
+        # Prepare the LLM with the chosen strategy
+        await llm_client.aprepare_llm()
+
+        # Send messages, unless the same request has been answered before
+        return await llm_client.ainvoke_cached(_extraction_messages(input_content))
 
 
 # Example usage
-if __name__ == "__main__":
-    # Use Pydantic strategy
-    # pydantic_response = process_form_data(use_pydantic=True)
-    # print("Pydantic Response:")
-    # print(json.dumps(pydantic_response, indent=4))
-
-    # Use JSON Schema strategy
-    json_schema_response = process_form_data(
-        data_schema_key="resume",
-        use_pydantic=True,
+def main():
+    parser = argparse.ArgumentParser(description="Extract structured data from a sample resume.")
+    parser.add_argument("--schema-key", default="resume", help="Data schema key to extract with")
+    parser.add_argument(
+        "--pydantic", action="store_true", help="Use the Pydantic model strategy instead of the JSON schema"
+    )
+    args = parser.parse_args()
+
+    response = process_form_data(
+        data_schema_key=args.schema_key,
+        use_pydantic=args.pydantic,
         input_content="""
         Extracted Form Fields:
         - Led: 40%
@@ -356,6 +759,10 @@ if __name__ == "__main__":
         """
     )
 
-    print("\nJSON Schema Response:")
+    print(f"\n{'Pydantic' if args.pydantic else 'JSON Schema'} Response:")
+
+    print(orjson.dumps(response, default=str, option=orjson.OPT_INDENT_2).decode())
 
-    print(json.dumps(json_schema_response, default=str, indent=4))
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,13 @@
+import atexit
 import logging
 import os
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
-from dotenv import load_dotenv
+from config import settings
 
-load_dotenv()
-
-app_name = os.getenv("APP_NAME")
+app_name = settings.app_name
 
 
 def setup_logger(name=app_name, log_file="phy_to_web.log", level=logging.INFO):
@@ -18,6 +18,7 @@ def setup_logger(name=app_name, log_file="phy_to_web.log", level=logging.INFO):
     - Console output
     - File logging with rotation
     - Structured logging
+    - Non-blocking emit: handlers run on a background listener thread
     """
     # Ensure log directory exists
     log_dir = os.path.dirname(log_file)
@@ -39,9 +40,10 @@ def setup_logger(name=app_name, log_file="phy_to_web.log", level=logging.INFO):
     )
     console_handler.setFormatter(console_formatter)
 
-    # File Handler with Rotation
+    # File Handler with Rotation; a large window keeps rollover stat/rename storms rare,
+    # and the rollover check runs on the queue listener thread rather than the caller's
     file_handler = RotatingFileHandler(
-        log_file, maxBytes=10 * 1024 * 1024, backupCount=5  # 10MB
+        log_file, maxBytes=100 * 1024 * 1024, backupCount=3  # 100MB
     )
     file_handler.setLevel(logging.DEBUG)
     file_formatter = logging.Formatter(
@@ -49,9 +51,14 @@ def setup_logger(name=app_name, log_file="phy_to_web.log", level=logging.INFO):
     )
     file_handler.setFormatter(file_formatter)
 
-    # Add handlers to logger
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    # Add handlers behind a queue so callers only enqueue records
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(
+        log_queue, console_handler, file_handler, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)  # Flush pending records on shutdown
+    logger.addHandler(QueueHandler(log_queue))
 
     return logger
 
@@ -1,24 +1,49 @@
 import redis
-import os
-from dotenv import load_dotenv
+import redis.asyncio
+from functools import lru_cache
+from config import settings
 
-load_dotenv()
+
+def _pool_options() -> dict:
+    return dict(
+        host=settings.redis_host,
+        port=settings.redis_port,
+        db=settings.redis_db,
+        max_connections=50,
+        socket_keepalive=True,
+        health_check_interval=30,  # Revalidate idle sockets before reuse
+        decode_responses=True  # Ensure responses are in string format
+    )
+
+
+@lru_cache(maxsize=1)
+def get_redis() -> redis.Redis:
+    """
+    Get the process-wide Redis client, creating its connection pool on first use.
+
+    Replies are parsed by hiredis when it is installed.
+
+    Returns:
+        redis.Redis: A client backed by a shared, keep-alive connection pool.
+    """
+    return redis.Redis(connection_pool=redis.ConnectionPool(**_pool_options()))
+
+
+@lru_cache(maxsize=1)
+def get_async_redis() -> redis.asyncio.Redis:
+    """
+    Get the process-wide asyncio Redis client for use from request handlers.
+
+    Returns:
+        redis.asyncio.Redis: A client backed by its own shared connection pool.
+    """
+    return redis.asyncio.Redis(connection_pool=redis.asyncio.ConnectionPool(**_pool_options()))
 
 
 class RedisFacade:
-    def __init__(self):
-        # Load environment variables
-        self.redis_host = os.getenv('REDIS_HOST', 'localhost')
-        self.redis_port = int(os.getenv('REDIS_PORT', 6379))
-        self.redis_db = int(os.getenv('REDIS_DB', 0))
-
-        # Initialize Redis client
-        self.client = redis.StrictRedis(
-            host=self.redis_host,
-            port=self.redis_port,
-            db=self.redis_db,
-            decode_responses=True  # Ensure responses are in string format
-        )
+    @property
+    def client(self) -> redis.Redis:
+        return get_redis()
 
     def set_cache(self, key: str, value: str, ttl: int = 3600) -> bool:
         """
@@ -38,6 +63,10 @@ class RedisFacade:
         except Exception as e:
             raise Exception(f"Error setting cache -> {e}") from e
 
+    @property
+    def async_client(self) -> redis.asyncio.Redis:
+        return get_async_redis()
+
     def get_cache(self, key: str) -> str:
         """
         Get a value from the Redis cache by key.
@@ -54,6 +83,41 @@ class RedisFacade:
         except Exception as e:
             raise Exception(f"Error getting cache -> {e}") from e
 
+    def get_many_cache(self, keys: list[str]) -> list:
+        """
+        Get several values from the Redis cache in a single round trip.
+
+        Args:
+            keys (list[str]): The keys to look up in the cache.
+
+        Returns:
+            list: The values in the same order as the keys, with None for misses.
+        """
+        try:
+            return self.client.mget(keys) if keys else []
+        except Exception as e:
+            raise Exception(f"Error getting cache entries -> {e}") from e
+
+    def set_many_cache(self, items: dict[str, str], ttl: int = 3600) -> bool:
+        """
+        Set several values in the Redis cache using one pipelined round trip.
+
+        Args:
+            items (dict[str, str]): The key/value pairs to store in the cache.
+            ttl (int): Time-to-live for each entry in seconds (default: 1 hour).
+
+        Returns:
+            bool: True if the cache entries were set successfully.
+        """
+        try:
+            with self.client.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.setex(key, ttl, value)
+                pipe.execute()
+            return True
+        except Exception as e:
+            raise Exception(f"Error setting cache entries -> {e}") from e
+
     def delete_cache(self, key: str) -> bool:
         """
         Delete a key from the Redis cache.
@@ -85,5 +149,123 @@ class RedisFacade:
         except Exception as e:
             raise Exception(f"Error checking cache existence -> {e}")
 
+    async def aset_cache(self, key: str, value: str, ttl: int = 3600) -> bool:
+        """
+        Async variant of set_cache that does not block the event loop.
+
+        Args:
+            key (str): The key to store in the cache.
+            value (str): The value associated with the key.
+            ttl (int): Time-to-live for the cache in seconds (default: 1 hour).
+
+        Returns:
+            bool: True if the cache was set successfully.
+        """
+        try:
+            await self.async_client.setex(key, ttl, value)
+            return True
+        except Exception as e:
+            raise Exception(f"Error setting cache -> {e}") from e
+
+    async def aget_cache(self, key: str) -> str:
+        """
+        Async variant of get_cache that does not block the event loop.
+
+        Args:
+            key (str): The key to look up in the cache.
+
+        Returns:
+            str: The value associated with the key, or None if not found.
+        """
+        try:
+            return await self.async_client.get(key)
+        except Exception as e:
+            raise Exception(f"Error getting cache -> {e}") from e
+
+    async def adelete_cache(self, key: str) -> bool:
+        """
+        Async variant of delete_cache that does not block the event loop.
+
+        Args:
+            key (str): The key to remove from the cache.
+
+        Returns:
+            bool: True if the key was removed successfully.
+        """
+        try:
+            await self.async_client.delete(key)
+            return True
+        except Exception as e:
+            raise Exception(f"Error deleting cache -> {e}") from e
+
+    async def aget_many_cache(self, keys: list[str]) -> list:
+        """
+        Async variant of get_many_cache that does not block the event loop.
+
+        Args:
+            keys (list[str]): The keys to look up in the cache.
+
+        Returns:
+            list: The values in the same order as the keys, with None for misses.
+        """
+        try:
+            return await self.async_client.mget(keys) if keys else []
+        except Exception as e:
+            raise Exception(f"Error getting cache entries -> {e}") from e
+
+    async def aset_many_cache(self, items: dict[str, str], ttl: int = 3600) -> bool:
+        """
+        Async variant of set_many_cache that does not block the event loop.
+
+        Args:
+            items (dict[str, str]): The key/value pairs to store in the cache.
+            ttl (int): Time-to-live for each entry in seconds (default: 1 hour).
+
+        Returns:
+            bool: True if the cache entries were set successfully.
+        """
+        try:
+            async with self.async_client.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.setex(key, ttl, value)
+                await pipe.execute()
+            return True
+        except Exception as e:
+            raise Exception(f"Error setting cache entries -> {e}") from e
+
+    def publish(self, channel: str, message: str) -> int:
+        """
+        Publish a message to every subscriber of a channel.
+
+        Args:
+            channel (str): The channel to publish on.
+            message (str): The message to send.
+
+        Returns:
+            int: The number of subscribers that received the message.
+        """
+        try:
+            return self.client.publish(channel, message)
+        except Exception as e:
+            raise Exception(f"Error publishing to channel {channel} -> {e}") from e
+
+    async def apublish(self, channel: str, message: str) -> int:
+        """Async variant of publish that does not block the event loop."""
+        try:
+            return await self.async_client.publish(channel, message)
+        except Exception as e:
+            raise Exception(f"Error publishing to channel {channel} -> {e}") from e
+
+    def async_pubsub(self) -> redis.asyncio.client.PubSub:
+        """Create a pub/sub connection on the asyncio client, for listening from the event loop."""
+        return self.async_client.pubsub(ignore_subscribe_messages=True)
+
+    async def aclose(self):
+        if get_async_redis.cache_info().currsize:
+            client = get_async_redis()
+            await client.aclose()
+            # The client was given its pool, so closing the client leaves the pool's connections open
+            await client.connection_pool.disconnect()
+
 
 redis_client = RedisFacade()
\ No newline at end of file
@@ -1,22 +1,43 @@
-import json
+import asyncio
+import io
+import logging
 import os
 import uuid
 from datetime import datetime, timezone
+from typing import Optional
 
-from dotenv import load_dotenv
+import orjson
 from fastapi import APIRouter, File, UploadFile, Form, Body, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 
-from llm_client import process_form_data, LLMProcessingError
+from config import settings
+from llm_client import (
+    aclear_schema_cache,
+    aprepare_form_llm,
+    aprocess_form_data_cached,
+    LLMProcessingError,
+)
 from logger import configured_logger
-from s3_facade import s3
-from text_extractor import extract_text
-from text_extractor2 import  text_extractor_enhanced
+from redis_facade import redis_client
+from s3_facade import s3, UPLOAD_OBJECT_PREFIX
+from text_extractor import (
+    extract_text_async,
+    FORM_TEXT_HEADER,
+    sync_text_detection_bytes,
+    textract_executor,
+    MAX_INLINE_DOCUMENT_BYTES,
+)
+from utils import get_file_hash, get_file_hash_stream, is_valid_filename
+
+app_name = settings.app_name
+
+# Textract output for an identical file is reused for a day
+EXTRACTION_CACHE_TTL = 24 * 3600
 
-load_dotenv()
+# Only images go to DetectDocumentText as inline bytes; other documents are read from S3
+INLINE_DOCUMENT_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png"})
 
-app_name = os.getenv("APP_NAME")
 router = APIRouter(
     prefix="/api",
     tags=[app_name],
@@ -46,7 +67,21 @@ class SchemaUploadRequest(BaseModel):
     data_schema: dict
 
 
-@router.post("/upload-schema", response_class=JSONResponse)
+class UploadUrlRequest(BaseModel):
+    file_name: str
+
+
+class UploadedFormRequest(BaseModel):
+    object_key: str
+    data_schema_key: str
+    case_type: str
+    case_sub_type: str
+    user_id: str
+    timestamp: Optional[str] = None
+    use_pydantic: Optional[str] = None
+
+
+@router.post("/upload-schema")
 async def upload_schema(payload: SchemaUploadRequest = Body(...)):
     """
     Upload a schema by providing a key and a JSON payload.
@@ -56,7 +91,7 @@ async def upload_schema(payload: SchemaUploadRequest = Body(...)):
         schema (dict): The JSON object representing the schema.
 
     Returns:
-        JSONResponse: A response indicating success or failure.
+        ORJSONResponse: A response indicating success or failure.
     """
     try:
         # Extract data
@@ -65,38 +100,172 @@ async def upload_schema(payload: SchemaUploadRequest = Body(...)):
 
         # Debug: Log the received inputs
         configured_logger.info(f"Received data_schema_key: {data_schema_key}")
-        print(f"Received schema: {schema}")
+        if configured_logger.isEnabledFor(logging.DEBUG):
+            configured_logger.debug("Received schema: %s", schema)
 
-        # Process the schema as needed (e.g., save it to S3, database, or a file)
-        # Example: Save schema to a file (replace with actual implementation)
-        file_name = "schema.json"
-        with open("schema.json", "w") as file:
-            json.dump(schema, file, indent=4)
-
-        # Debug: Confirm saving the file
-        print(f"Schema saved to {file_name}")
-
-        s3.upload_schema(data_schema_key)
+        # Store the schema in S3 straight from memory
+        await s3.upload_schema_async(data_schema_key, schema)
+        await aclear_schema_cache(f"{data_schema_key}.json")
 
         # Return a success response
-        return JSONResponse(
-            content={
-                "message": "Schema uploaded successfully",
-                "data_schema_key": data_schema_key,
-            },
-            status_code=200,
-        )
+        return {
+            "message": "Schema uploaded successfully",
+            "data_schema_key": data_schema_key,
+        }
 
     except Exception as e:
         # Handle errors
         configured_logger.error(f"Error uploading schema --> {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             content={"error": "Failed to upload schema", "details": str(e)},
             status_code=500,
         )
 
 
-@router.post("/extract/", response_class=JSONResponse)
+@router.post("/upload-url")
+async def create_upload_url(payload: UploadUrlRequest = Body(...)):
+    """
+    Create a presigned URL the client PUTs a form to, so its bytes go straight to S3.
+
+    Once the PUT succeeds, the returned object_key is passed to /extract/uploaded/.
+
+    Args:
+        file_name (str): The client's name for the file.
+
+    Returns:
+        ORJSONResponse: The upload URL, object key and required Content-Type, or an error message.
+    """
+    try:
+        # Presigning is local signing work; no request is sent to S3
+        return s3.generate_form_upload_url(payload.file_name)
+
+    except ValueError as e:
+        return ORJSONResponse(content={"error": str(e)}, status_code=400)
+
+    except Exception as e:
+        configured_logger.error(f"Error creating upload URL --> {e}")
+        return ORJSONResponse(
+            content={"error": "Failed to create upload URL", "details": str(e)},
+            status_code=500,
+        )
+
+
+async def _document_text(file: UploadFile, metadata: FormMetadata) -> str:
+    """Upload one document and return the text Textract extracts from it."""
+    # Construct a unique filename
+    original_filename = file.filename
+    file_extension = os.path.splitext(original_filename)[1]
+
+    # Generate a unique UUID
+    file_uuid = uuid.uuid4()
+    constructed_filename = (
+        f"{metadata.case_type}_{metadata.case_sub_type}_{metadata.user_id}_{file_uuid}"
+        f"{file_extension}"
+    )
+
+    # A previously seen copy of the same file skips the upload and Textract; its LLM
+    # extraction is then answered from the response cache for the current schema
+    if (
+        file_extension.lower() in INLINE_DOCUMENT_EXTENSIONS
+        and file.size is not None
+        and file.size <= MAX_INLINE_DOCUMENT_BYTES
+    ):
+        # Small images are read once; hashing, Textract and the upload all work from that buffer
+        file_bytes = await file.read()
+        file_hash = await asyncio.to_thread(get_file_hash, file_bytes)
+    else:
+        # Larger documents stream from the spooled upload; the content-addressed key needs the
+        # hash before the upload starts, so they are read twice rather than buffered
+        file_bytes = None
+        file_hash = await asyncio.to_thread(get_file_hash_stream, file.file)
+
+    cache_key = f"extract_text:{file_hash}"
+    form_text_data = await redis_client.aget_cache(cache_key)
+    if form_text_data is not None:
+        configured_logger.info(f"Returning cached text extraction for {original_filename}")
+    else:
+        form_text_data = await _extract_text(file, constructed_filename, file_hash, file_bytes)
+
+    # Debug: Log the Textract response
+    if configured_logger.isEnabledFor(logging.DEBUG):
+        configured_logger.debug("Textract Response: %s", form_text_data)
+
+    return form_text_data
+
+
+async def _extract_document(file: UploadFile, metadata: FormMetadata, use_pydantic: bool) -> dict:
+    """Upload one document, run Textract on it and extract its form data with the LLM."""
+    return await _extract_form_data(_document_text(file, metadata), metadata, use_pydantic)
+
+
+async def _extract_form_data(document_text, metadata: FormMetadata, use_pydantic: bool) -> dict:
+    """Await the document's text and extract its form data with the LLM."""
+    # The schema fetch and structured-output binding overlap the upload and Textract
+    form_text_data, _ = await asyncio.gather(
+        document_text,
+        aprepare_form_llm(metadata.data_schema_key, use_pydantic),
+    )
+
+    result = await aprocess_form_data_cached(
+        data_schema_key=metadata.data_schema_key,
+        use_pydantic=use_pydantic,
+        input_content=form_text_data,
+    )
+
+    # Compile the response data
+    return {
+        "data_schema_key": metadata.data_schema_key,
+        "case_type": metadata.case_type,
+        "case_sub_type": metadata.case_sub_type,
+        "user_id": metadata.user_id,
+        "timestamp": metadata.timestamp,
+        "form_text_data": form_text_data,
+        "extracted_form_data": result,
+    }
+
+
+async def _extract_text(
+        file: UploadFile, file_name: str, file_hash: str, file_bytes: Optional[bytes] = None
+) -> str:
+    """
+    Store the document in S3 and return the text Textract extracts from it.
+
+    When the document has already been read into file_bytes, it is sent to Textract inline
+    while the S3 copy uploads alongside, instead of Textract reading it back from S3.
+    """
+    # The S3 upload is async; Textract calls block, so they run on their own worker threads
+    loop = asyncio.get_running_loop()
+    if file_bytes is not None:
+        _, form_text_data = await asyncio.gather(
+            s3.upload_pdf_form_with_caching_async(
+                fileobj=io.BytesIO(file_bytes), file_name=file_name, file_hash=file_hash
+            ),
+            loop.run_in_executor(textract_executor, sync_text_detection_bytes, file_bytes),
+        )
+
+        # Textract errors come back as messages rather than exceptions; only cache real extractions
+        if form_text_data.startswith(FORM_TEXT_HEADER):
+            await redis_client.aset_cache(
+                f"extract_text:{file_hash}", form_text_data, ttl=EXTRACTION_CACHE_TTL
+            )
+        return form_text_data
+
+    uploaded_filename = await s3.upload_pdf_form_with_caching_async(
+        fileobj=file.file, file_name=file_name, file_hash=file_hash
+    )
+
+    # Cached under the same content key by extract_text_async
+    return await extract_text_async([uploaded_filename])
+
+
+def _llm_error_detail(e: LLMProcessingError) -> dict:
+    return {
+        "error": str(e),
+        "original_error": str(e.original_error) if e.original_error else None
+    }
+
+
+@router.post("/extract/")
 async def extract_form_data(
         file: UploadFile = File(...),
         data_schema_key: str = Form(...),
@@ -118,7 +287,7 @@ async def extract_form_data(
         timestamp (str): Optional timestamp.
 
     Returns:
-        JSONResponse: Extracted form data or error message.
+        ORJSONResponse: Extracted form data or error message.
         :param use_pydantic:
     """
     try:
@@ -131,60 +300,204 @@ async def extract_form_data(
             timestamp=timestamp,
         )
 
-        print(use_pydantic == "yes")
+        response_data = await _extract_document(file, metadata, use_pydantic == "yes")
 
-        # Construct a unique filename
-        original_filename = file.filename
-        file_extension = os.path.splitext(original_filename)[1]
+        # Return the response directly: a plain dict would first be walked by jsonable_encoder,
+        # which cannot pass the pre-serialized LLM output through
+        return ORJSONResponse(content=response_data)
+
+    except LLMProcessingError as e:
+        raise HTTPException(status_code=400, detail=_llm_error_detail(e))
 
-        # Generate a unique UUID
-        file_uuid = uuid.uuid4()
-        constructed_filename = (
-            f"{metadata.case_type}_{metadata.case_sub_type}_{metadata.user_id}_{file_uuid}"
-            f"{file_extension}"
+    except Exception as e:
+        # Handle errors
+        configured_logger.error(f"Error processing the file --> {e}")
+        return ORJSONResponse(
+            content={"error": "Failed to extract form data", "details": str(e)},
+            status_code=500,
         )
-        file_content = await file.read()
 
-        uploaded_filename = s3.upload_pdf_form_with_caching(file_content=file_content, file_name=constructed_filename)
 
-        form_text_data = extract_text([uploaded_filename])
+@router.post("/extract/uploaded/")
+async def extract_uploaded_form_data(payload: UploadedFormRequest = Body(...)):
+    """
+    Extract form data from a document the client uploaded through a URL from /upload-url.
 
-        # Debug: Log the Textract response
-        print("Textract Response:", form_text_data)
+    Args:
+        object_key (str): The object key returned alongside the upload URL.
+        data_schema_key (str): Form Schema Key.
+        case_type (str): Type of case.
+        case_sub_type (str): Subtype of case.
+        user_id (str): User ID.
+        timestamp (str): Optional timestamp.
 
-        result = process_form_data(
-            data_schema_key=data_schema_key,
-            use_pydantic=use_pydantic == "yes",
-            input_content=form_text_data,
-        )
+    Returns:
+        ORJSONResponse: Extracted form data or error message.
+        :param use_pydantic:
+    """
+    # Only objects created through /upload-url may be extracted, not arbitrary bucket keys
+    object_key = payload.object_key
+    if not (
+        object_key.startswith(UPLOAD_OBJECT_PREFIX)
+        and is_valid_filename(object_key[len(UPLOAD_OBJECT_PREFIX):])
+    ):
+        return ORJSONResponse(content={"error": "Invalid object key"}, status_code=400)
 
-        # Compile the response data
-        response_data = {
-            "data_schema_key": metadata.data_schema_key,
-            "case_type": metadata.case_type,
-            "case_sub_type": metadata.case_sub_type,
-            "user_id": metadata.user_id,
-            "timestamp": metadata.timestamp,
-            "form_text_data": form_text_data,
-            "extracted_form_data": result,
-        }
+    try:
+        metadata = FormMetadata(
+            data_schema_key=payload.data_schema_key,
+            case_type=payload.case_type,
+            case_sub_type=payload.case_sub_type,
+            user_id=payload.user_id,
+            timestamp=payload.timestamp,
+        )
 
-        # Return the response data
-        return JSONResponse(content=response_data, status_code=200)
+        # The document is already in the form bucket, so Textract reads it from there
+        response_data = await _extract_form_data(
+            extract_text_async([object_key]), metadata, payload.use_pydantic == "yes"
+        )
+        return ORJSONResponse(content=response_data)
 
     except LLMProcessingError as e:
-        raise HTTPException(
-            status_code=400,
-            detail={
-                "error": str(e),
-                "original_error": str(e.original_error) if e.original_error else None
-            }
+        raise HTTPException(status_code=400, detail=_llm_error_detail(e))
+
+    except Exception as e:
+        configured_logger.error(f"Error processing the uploaded file {object_key} --> {e}")
+        return ORJSONResponse(
+            content={"error": "Failed to extract form data", "details": str(e)},
+            status_code=500,
         )
 
+
+@router.post("/extract/batch/")
+async def extract_form_data_batch(
+        files: list[UploadFile] = File(...),
+        data_schema_key: str = Form(...),
+        case_type: str = Form(...),
+        case_sub_type: str = Form(...),
+        user_id: str = Form(...),
+        timestamp: str = Form(None),
+        use_pydantic: str = Form(None)
+):
+    """
+    Extract form data from several uploaded files of the same form type concurrently.
+
+    Args:
+        files (list[UploadFile]): The uploaded files containing form data.
+        data_schema_key (str): Form Schema Key.
+        case_type (str): Type of case.
+        case_sub_type (str): Subtype of case.
+        user_id (str): User ID.
+        timestamp (str): Optional timestamp.
+
+    Returns:
+        ORJSONResponse: Extracted form data per file, in upload order, or an error per failed file.
+        :param use_pydantic:
+    """
+    metadata = FormMetadata(
+        data_schema_key=data_schema_key,
+        case_type=case_type,
+        case_sub_type=case_sub_type,
+        user_id=user_id,
+        timestamp=timestamp,
+    )
+
+    # Uploads, Textract jobs and LLM calls for all files overlap instead of running one file at a time
+    results = await asyncio.gather(
+        *(_extract_document(file, metadata, use_pydantic == "yes") for file in files),
+        return_exceptions=True,
+    )
+
+    response_data = []
+    for file, result in zip(files, results):
+        if isinstance(result, LLMProcessingError):
+            response_data.append({"file_name": file.filename, **_llm_error_detail(result)})
+        elif isinstance(result, Exception):
+            configured_logger.error(f"Error processing the file {file.filename} --> {result}")
+            response_data.append(
+                {"file_name": file.filename, "error": "Failed to extract form data", "details": str(result)}
+            )
+        else:
+            response_data.append(result)
+
+    return ORJSONResponse(content={"results": response_data})
+
+
+@router.post("/extract/stream/")
+async def extract_form_data_stream(
+        file: UploadFile = File(...),
+        data_schema_key: str = Form(...),
+        case_type: str = Form(...),
+        case_sub_type: str = Form(...),
+        user_id: str = Form(...),
+        timestamp: str = Form(None),
+        use_pydantic: str = Form(None)
+):
+    """
+    Extract form data like /extract/, streaming NDJSON so the Textract output arrives before the LLM finishes.
+
+    The first line carries the request metadata and form_text_data ("stage": "textract"); the
+    second carries extracted_form_data ("stage": "llm"), or the error ("stage": "error").
+
+    Args:
+        file (UploadFile): The uploaded file containing form data.
+        data_schema_key (str): Form Schema Key.
+        case_type (str): Type of case.
+        case_sub_type (str): Subtype of case.
+        user_id (str): User ID.
+        timestamp (str): Optional timestamp.
+
+    Returns:
+        StreamingResponse: Newline-delimited JSON events, or an error message if Textract fails.
+        :param use_pydantic:
+    """
+    metadata = FormMetadata(
+        data_schema_key=data_schema_key,
+        case_type=case_type,
+        case_sub_type=case_sub_type,
+        user_id=user_id,
+        timestamp=timestamp,
+    )
+
+    # The upload is closed once this handler returns, so it is fully consumed before streaming starts
+    try:
+        form_text_data, _ = await asyncio.gather(
+            _document_text(file, metadata),
+            aprepare_form_llm(metadata.data_schema_key, use_pydantic == "yes"),
+        )
     except Exception as e:
-        # Handle errors
         configured_logger.error(f"Error processing the file --> {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             content={"error": "Failed to extract form data", "details": str(e)},
             status_code=500,
         )
+
+    async def events():
+        yield orjson.dumps(
+            {
+                "stage": "textract",
+                "data_schema_key": metadata.data_schema_key,
+                "case_type": metadata.case_type,
+                "case_sub_type": metadata.case_sub_type,
+                "user_id": metadata.user_id,
+                "timestamp": metadata.timestamp,
+                "form_text_data": form_text_data,
+            }
+        ) + b"\n"
+
+        try:
+            result = await aprocess_form_data_cached(
+                data_schema_key=metadata.data_schema_key,
+                use_pydantic=use_pydantic == "yes",
+                input_content=form_text_data,
+            )
+            yield orjson.dumps({"stage": "llm", "extracted_form_data": result}) + b"\n"
+        except LLMProcessingError as e:
+            yield orjson.dumps({"stage": "error", **_llm_error_detail(e)}) + b"\n"
+        except Exception as e:
+            configured_logger.error(f"Error processing the file --> {e}")
+            yield orjson.dumps(
+                {"stage": "error", "error": "Failed to extract form data", "details": str(e)}
+            ) + b"\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
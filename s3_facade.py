@@ -1,28 +1,64 @@
+import asyncio
+import aioboto3
 import boto3
+import mimetypes
+import orjson
 import os
-from dotenv import load_dotenv
+import socket
+import uuid
+from contextlib import AsyncExitStack
+from typing import BinaryIO, Optional
+from aiobotocore.config import AioConfig
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from config import settings
 from logger import configured_logger
 from botocore.exceptions import NoCredentialsError, ClientError
 from redis_facade import redis_client
-from utils import is_valid_filename, get_file_hash
+from utils import is_valid_filename, get_file_hash_stream
 
-load_dotenv()
+# Large forms are uploaded in concurrent parts so memory stays bounded by the chunk size.
+# The threshold matches the chunk size: anything smaller would go multipart as one part,
+# paying three requests where a single PUT does
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=settings.s3_upload_concurrency,
+    use_threads=True,
+)
+
+# botocore sends request bodies through urllib3 connections, which read file-like bodies in
+# blocksize chunks (16 KiB by default); 1 MiB cuts the syscalls and GIL round trips per part.
+# Applied to the sync S3 client's connection pools only
+UPLOAD_SOCKET_BLOCKSIZE = 1024 * 1024
+
+# Connection pool sized for the multipart upload threads of several concurrent requests,
+# kept alive between requests, with adaptive retries to absorb throttling. Short connect
+# timeouts fail fast on a dead endpoint; urllib3 already disables Nagle (TCP_NODELAY)
+S3_CLIENT_OPTIONS = dict(
+    signature_version="s3v4",
+    s3={"addressing_style": "virtual"},
+    max_pool_connections=50,
+    retries={"mode": "adaptive", "max_attempts": 5},
+    tcp_keepalive=True,
+    connect_timeout=3,
+    read_timeout=30,
+)
+
+# Schemas larger than one range are fetched as concurrent byte-range GETs
+DOWNLOAD_RANGE_SIZE = 16 * 1024 * 1024
+
+# Presigned client uploads land under this prefix, apart from the content-addressed forms
+UPLOAD_OBJECT_PREFIX = "uploads/"
 
 
 class S3Facade:
     def __init__(self):
-        # Print out environment variable loading for debugging
-        print("Environment Variables:")
-        print(f"AWS_ACCESS_KEY_ID: {bool(os.getenv('AWS_ACCESS_KEY_ID'))}")
-        print(f"AWS_SECRET_ACCESS_KEY: {bool(os.getenv('AWS_SECRET_ACCESS_KEY'))}")
-        print(f"AWS_REGION: {os.getenv('AWS_REGION')}")
-        print(f"S3_FORM_BUCKET: {os.getenv('S3_FORM_BUCKET')}")
-
-        self.aws_access_key_id = os.getenv("AWS_ACCESS_KEY_ID")
-        self.aws_secret_access_key = os.getenv("AWS_SECRET_ACCESS_KEY")
-        self.aws_region = os.getenv("AWS_REGION")
-        self.form_pdf_bucket_name = os.getenv("S3_FORM_BUCKET")
-        self.data_schema_bucket_name = os.getenv("S3_DATA_SCHEMA_BUCKET")
+        self.aws_access_key_id = settings.aws_access_key_id
+        self.aws_secret_access_key = settings.aws_secret_access_key
+        self.aws_region = settings.aws_region
+        self.form_pdf_bucket_name = settings.s3_form_bucket
+        self.data_schema_bucket_name = settings.s3_data_schema_bucket
 
         # Add additional validation
         if not all(
@@ -42,85 +78,269 @@ class S3Facade:
             aws_access_key_id=self.aws_access_key_id,
             aws_secret_access_key=self.aws_secret_access_key,
             region_name=self.aws_region,
+            config=Config(**S3_CLIENT_OPTIONS),
         )
+        # urllib3 passes the pool manager's blocksize to every connection it opens
+        self.s3._endpoint.http_session._manager.connection_pool_kw["blocksize"] = UPLOAD_SOCKET_BLOCKSIZE
 
-    def upload_pdf_form_with_caching(self, file_content: bytes, file_name: str) -> str:
+        # The async client is opened on first use and kept for the life of the process
+        self.async_session = aioboto3.Session(
+            aws_access_key_id=self.aws_access_key_id,
+            aws_secret_access_key=self.aws_secret_access_key,
+            region_name=self.aws_region,
+        )
+        self._async_s3 = None
+        self._async_exit_stack = AsyncExitStack()
+        self._async_lock = asyncio.Lock()
+        self._form_upload_validated = False
+
+    async def get_async_s3(self):
+        if self._async_s3 is None:
+            async with self._async_lock:
+                if self._async_s3 is None:
+                    self._async_s3 = await self._async_exit_stack.enter_async_context(
+                        self.async_session.client("s3", config=AioConfig(**S3_CLIENT_OPTIONS))
+                    )
+        return self._async_s3
+
+    async def close_async(self):
+        await self._async_exit_stack.aclose()
+        self._async_s3 = None
+
+    def prime_dns(self):
+        """Resolve the bucket endpoints once so the first requests don't wait on DNS."""
+        for bucket_name in (self.form_pdf_bucket_name, self.data_schema_bucket_name):
+            if bucket_name:
+                host = f"{bucket_name}.s3.{self.aws_region}.amazonaws.com"
+                try:
+                    socket.getaddrinfo(host, 443, type=socket.SOCK_STREAM)
+                except OSError as e:
+                    configured_logger.warning("Could not resolve %s: %s", host, e)
+
+    def upload_pdf_form_with_caching(self, fileobj: BinaryIO, file_name: str) -> str:
         """
         Uploads a pdf form to the specified S3 bucket and returns the URL of the uploaded file.
 
         Args:
-            file_content (bytes): The content of the file to upload.
+            fileobj (BinaryIO): A binary file-like object positioned at the start of the content to upload.
             file_name (str): The name of the file to upload.
 
         Returns:
-            str: The URL of the uploaded file in S3.
+            str: The content-addressed key under which the file is stored in S3.
         """
 
         # Validate filename
         if not is_valid_filename(file_name):
             raise ValueError(f"Invalid file name: {file_name}")
 
-        file_hash = get_file_hash(file_content)
+        file_hash = get_file_hash_stream(fileobj)
 
-        if redis_client.exists_cache(file_hash):
-            existing_file_name = redis_client.get_cache(file_hash)
-            configured_logger.warn(f"File content already exists. Returning existing file name: {existing_file_name}")
+        # A single GET answers both "is it cached" and "under which name"
+        existing_file_name = redis_client.get_cache(file_hash)
+        if existing_file_name is not None:
+            configured_logger.warning(f"File content already exists. Returning existing file name: {existing_file_name}")
             return existing_file_name
         else:
             # Upload the new file and store the hash and filename in cache
-            # Add extensive logging and validation
-            configured_logger.info(f"Attempting to upload file: {file_name}")
-            configured_logger.info(
-                f"Bucket name from environment: '{self.form_pdf_bucket_name}'"
-            )
-            configured_logger.info(f"AWS Access Key ID: '{bool(self.aws_access_key_id)}'")
-            configured_logger.info(f"AWS Region: '{self.aws_region}'")
-
-            # Explicit validation of critical parameters
-            if not self.form_pdf_bucket_name:
-                error_msg = "S3 bucket name is not set. Check your .env file and S3_FORM_BUCKET variable."
-                raise ValueError(error_msg)
-
-            if not self.aws_access_key_id or not self.aws_secret_access_key:
-                error_msg = "AWS credentials are missing. Check your .env file."
-                raise ValueError(error_msg)
+            self._validate_form_upload(file_name)
+            object_key = self._form_object_key(file_hash, file_name)
 
             try:
-                # Explicitly pass all parameters
-                self.s3.put_object(
-                    Bucket=str(self.form_pdf_bucket_name),  # Ensure it's a string
-                    Key=file_name,
-                    Body=file_content,
-                )
+                # The key is derived from the content, so S3 itself knows whether it is already stored
+                if self._form_object_exists(object_key):
+                    configured_logger.info(f"File content already in S3 as {object_key}; skipping upload")
+                else:
+                    # Stream the file in parts rather than buffering it in memory
+                    self.s3.upload_fileobj(
+                        fileobj,
+                        str(self.form_pdf_bucket_name),  # Ensure it's a string
+                        object_key,
+                        Config=TRANSFER_CONFIG,
+                        ExtraArgs=self._form_upload_args(file_name),
+                    )
 
-                file_url = f"https://{self.form_pdf_bucket_name}.s3.{self.aws_region}.amazonaws.com/{file_name}"
-                configured_logger.info(f"File uploaded to S3: {file_url}")
-                redis_client.set_cache(file_hash, file_name)
-                return file_name
+                    file_url = f"https://{self.form_pdf_bucket_name}.s3.{self.aws_region}.amazonaws.com/{object_key}"
+                    configured_logger.info(f"File uploaded to S3: {file_url}")
+                redis_client.set_cache(file_hash, object_key)
+                return object_key
             except Exception as e:
                 raise Exception(
                     f"Could not upload file {file_name} {type(e).__name__} to S3 -> {str(e)}"
                 )
 
-    def upload_schema(self, schema_key: str) -> str:
+    async def upload_pdf_form_with_caching_async(
+        self, fileobj: BinaryIO, file_name: str, file_hash: Optional[str] = None
+    ) -> str:
+        """
+        Async variant of upload_pdf_form_with_caching that keeps the event loop free during the upload.
+
+        Args:
+            fileobj (BinaryIO): A binary file-like object positioned at the start of the content to upload.
+            file_name (str): The name of the file to upload.
+            file_hash (str, optional): The content hash, if the caller has already computed it.
+
+        Returns:
+            str: The name under which the file content is stored in S3.
+        """
+
+        # Validate filename
+        if not is_valid_filename(file_name):
+            raise ValueError(f"Invalid file name: {file_name}")
+
+        if file_hash is None:
+            file_hash = await asyncio.to_thread(get_file_hash_stream, fileobj)
+
+        existing_file_name = await redis_client.aget_cache(file_hash)
+        if existing_file_name is not None:
+            configured_logger.warning(f"File content already exists. Returning existing file name: {existing_file_name}")
+            return existing_file_name
+
+        self._validate_form_upload(file_name)
+        object_key = self._form_object_key(file_hash, file_name)
+
+        try:
+            client = await self.get_async_s3()
+            if await self._form_object_exists_async(client, object_key):
+                configured_logger.info(f"File content already in S3 as {object_key}; skipping upload")
+            else:
+                await client.upload_fileobj(
+                    fileobj,
+                    str(self.form_pdf_bucket_name),
+                    object_key,
+                    Config=TRANSFER_CONFIG,
+                    ExtraArgs=self._form_upload_args(file_name),
+                )
+
+                file_url = f"https://{self.form_pdf_bucket_name}.s3.{self.aws_region}.amazonaws.com/{object_key}"
+                configured_logger.info(f"File uploaded to S3: {file_url}")
+            await redis_client.aset_cache(file_hash, object_key)
+            return object_key
+        except Exception as e:
+            raise Exception(
+                f"Could not upload file {file_name} {type(e).__name__} to S3 -> {str(e)}"
+            )
+
+    def generate_form_upload_url(self, file_name: str, expires: int = 3600) -> dict:
+        """
+        Create a presigned PUT URL so a client can upload a form straight to S3.
+
+        Args:
+            file_name (str): The client's name for the file; only its extension is kept.
+            expires (int): Seconds the URL stays valid (default: 1 hour).
+
+        Returns:
+            dict: The upload URL, the object key it writes to and the Content-Type the PUT must send.
+        """
+        if not is_valid_filename(file_name):
+            raise ValueError(f"Invalid file name: {file_name}")
+
+        # The content isn't known yet, so the key can't be content-addressed
+        object_key = f"{UPLOAD_OBJECT_PREFIX}{uuid.uuid4().hex}{os.path.splitext(file_name)[1].lower()}"
+        content_type = self._form_upload_args(file_name)["ContentType"]
+
+        try:
+            upload_url = self.s3.generate_presigned_url(
+                "put_object",
+                Params={
+                    "Bucket": self.form_pdf_bucket_name,
+                    "Key": object_key,
+                    "ContentType": content_type,
+                },
+                ExpiresIn=expires,
+            )
+        except (NoCredentialsError, ClientError) as e:
+            raise Exception(f"Could not create upload URL for {file_name} -> {e}")
+
+        return {"upload_url": upload_url, "object_key": object_key, "content_type": content_type}
+
+    @staticmethod
+    def _form_object_key(file_hash: str, file_name: str) -> str:
+        # Identical content always maps to the same object, whatever name it was uploaded under
+        return f"forms/{file_hash}{os.path.splitext(file_name)[1].lower()}"
+
+    def _form_object_exists(self, object_key: str) -> bool:
+        try:
+            self.s3.head_object(Bucket=self.form_pdf_bucket_name, Key=object_key)
+            return True
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    async def _form_object_exists_async(self, client, object_key: str) -> bool:
+        try:
+            await client.head_object(Bucket=self.form_pdf_bucket_name, Key=object_key)
+            return True
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def _validate_form_upload(self, file_name: str):
+        configured_logger.info(f"Attempting to upload file: {file_name}")
+
+        # The configuration can't change after startup, so it is checked and logged once
+        if self._form_upload_validated:
+            return
+
+        configured_logger.info(
+            f"Bucket name from environment: '{self.form_pdf_bucket_name}'"
+        )
+        configured_logger.info(f"AWS Access Key ID: '{bool(self.aws_access_key_id)}'")
+        configured_logger.info(f"AWS Region: '{self.aws_region}'")
+
+        # Explicit validation of critical parameters
+        if not self.form_pdf_bucket_name:
+            error_msg = "S3 bucket name is not set. Check your .env file and S3_FORM_BUCKET variable."
+            raise ValueError(error_msg)
+
+        if not self.aws_access_key_id or not self.aws_secret_access_key:
+            error_msg = "AWS credentials are missing. Check your .env file."
+            raise ValueError(error_msg)
+
+        self._form_upload_validated = True
+
+    @staticmethod
+    def _form_upload_args(file_name: str) -> dict:
+        return {
+            "ContentType": mimetypes.guess_type(file_name)[0] or "application/octet-stream",
+            # Keep the descriptive upload name alongside the content-addressed key
+            "Metadata": {"original-name": file_name},
+        }
+
+    def upload_schema(self, schema_key: str, schema: dict) -> str:
         """
-        Uploads a schema file to the specified S3 bucket and returns the URL of the uploaded file.
+        Uploads a schema to the specified S3 bucket and returns the URL of the uploaded file.
 
         Args:
             schema_key (str): The name of the file to upload.
+            schema (dict): The JSON schema to store.
 
         Returns:
             str: The URL of the uploaded schema in S3.
         """
         try:
-            # Read the schema file as a byte stream
-            with open("schema.json", "rb") as f:
-                byte_content = f.read()
-
             self.s3.put_object(
                 Bucket=self.data_schema_bucket_name,
                 Key=f"{schema_key}.json",
-                Body=byte_content,
+                Body=orjson.dumps(schema),
+                ContentType="application/json",
+            )
+
+            file_url = f"https://{self.data_schema_bucket_name}.s3.{self.aws_region}.amazonaws.com/{schema_key}"
+            configured_logger.info(f"Schema uploaded to S3: {file_url}")
+            return file_url
+        except (NoCredentialsError, ClientError) as e:
+            raise Exception(f"Could not upload schema {schema_key} to S3 -> {e}")
+
+    async def upload_schema_async(self, schema_key: str, schema: dict) -> str:
+        """Async variant of upload_schema that keeps the event loop free during the upload."""
+        try:
+            client = await self.get_async_s3()
+            await client.put_object(
+                Bucket=self.data_schema_bucket_name,
+                Key=f"{schema_key}.json",
+                Body=orjson.dumps(schema),
                 ContentType="application/json",
             )
 
@@ -139,7 +359,9 @@ class S3Facade:
 
             # Log successful download
             configured_logger.debug(
-                f"Data schema '{file_name}' downloaded successfully from S3 bucket '{self.data_schema_bucket_name}'."
+                "Data schema '%s' downloaded successfully from S3 bucket '%s'.",
+                file_name,
+                self.data_schema_bucket_name,
             )
 
             # Return the content of the file
@@ -163,6 +385,74 @@ class S3Facade:
                 f"Unexpected error during S3 download of '{file_name}' from bucket '{self.data_schema_bucket_name}' {e}"
             ) from e
 
+    async def _download_range(self, client, file_name: str, start: int, end: int) -> bytes:
+        response = await client.get_object(
+            Bucket=self.data_schema_bucket_name,
+            Key=file_name,
+            Range=f"bytes={start}-{end}",
+        )
+        async with response["Body"] as body:
+            return await body.read()
+
+    async def download_schema_async(self, file_name: str) -> bytes:
+        """
+        Downloads a schema without blocking the event loop.
+
+        The first range GET also reports the object size; any remaining ranges are
+        fetched concurrently and joined in order.
+        """
+        try:
+            client = await self.get_async_s3()
+            response = await client.get_object(
+                Bucket=self.data_schema_bucket_name,
+                Key=file_name,
+                Range=f"bytes=0-{DOWNLOAD_RANGE_SIZE - 1}",
+            )
+            async with response["Body"] as body:
+                first_chunk = await body.read()
+
+            # ContentRange looks like "bytes 0-16777215/52428800"
+            total_size = int(response["ContentRange"].rsplit("/", 1)[1])
+            if total_size > len(first_chunk):
+                remaining_chunks = await asyncio.gather(
+                    *(
+                        self._download_range(
+                            client,
+                            file_name,
+                            start,
+                            min(start + DOWNLOAD_RANGE_SIZE, total_size) - 1,
+                        )
+                        for start in range(len(first_chunk), total_size, DOWNLOAD_RANGE_SIZE)
+                    )
+                )
+                content = b"".join((first_chunk, *remaining_chunks))
+            else:
+                content = first_chunk
+
+            configured_logger.debug(
+                "Data schema '%s' downloaded successfully from S3 bucket '%s'.",
+                file_name,
+                self.data_schema_bucket_name,
+            )
+            return content
+
+        except NoCredentialsError as e:
+            configured_logger.error(
+                f"S3 download error: Missing credentials when downloading '{file_name}' from bucket '{self.data_schema_bucket_name}': {e}"
+            )
+            raise Exception(
+                f"Missing credentials for S3 download of '{file_name}'."
+            ) from e
+
+        except ClientError as e:
+            raise Exception(
+                f"Client error during S3 download of '{file_name}' from bucket '{self.data_schema_bucket_name}' -> {e}"
+            )
+
+        except Exception as e:
+            raise Exception(
+                f"Unexpected error during S3 download of '{file_name}' from bucket '{self.data_schema_bucket_name}' {e}"
+            ) from e
+
 
 s3 = S3Facade()
-# s3.upload_schema("registration.json")
@@ -1,32 +1,62 @@
+import asyncio
+import contextlib
 from contextlib import asynccontextmanager
 
 import uvicorn
-from dotenv import load_dotenv
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from router import router
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
+from config import settings
+from llm_client import awarm_prepared_llms, listen_for_schema_invalidations
 from logger import configured_logger
+from redis_facade import redis_client
+from s3_facade import s3
+from text_extractor import close_async_textract, textract_executor
 
 import os
 
-# Load environment variables from .env file
-load_dotenv()
+app_name = settings.app_name
 
-app_name = os.getenv("APP_NAME")
+# Comma-separated schema keys to prepare at startup; defaults to every known key
+preload_schema_keys = [
+    key.strip() for key in settings.preload_schema_keys.split(",") if key.strip()
+]
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     configured_logger.info(f"Starting {app_name} Service...")
+    configured_logger.info(
+        "AWS credentials set: %s, region: %s, form bucket: %s, schema bucket: %s",
+        bool(s3.aws_access_key_id and s3.aws_secret_access_key),
+        s3.aws_region,
+        s3.form_pdf_bucket_name,
+        s3.data_schema_bucket_name,
+    )
+    await asyncio.gather(
+        awarm_prepared_llms(preload_schema_keys),
+        asyncio.to_thread(s3.prime_dns),
+    )
+    invalidation_listener = asyncio.create_task(listen_for_schema_invalidations())
     try:
         yield
     finally:
         configured_logger.info(f"Shutting down {app_name} Service...")
+        invalidation_listener.cancel()
+        # Let the listener unwind before the Redis client it reads from is closed
+        with contextlib.suppress(asyncio.CancelledError):
+            await invalidation_listener
+        await s3.close_async()
+        await close_async_textract()
+        await redis_client.aclose()
+        textract_executor.shutdown(wait=False, cancel_futures=True)
 
 
 app = FastAPI(
     title=f"{app_name} Service",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan,  # Define the lifespan context manager
 )
 
@@ -34,17 +64,34 @@ app = FastAPI(
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     configured_logger.error(f"Unhandled exception: {exc}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={"detail": "Internal Server Error"},
     )
 
 
 # Define a root route
-@app.get("/", response_class=JSONResponse)
+@app.get("/")
 async def root():
     return {"detail": f"Welcome to the Root of the {app_name} Service!"}
 
+
+class StreamAwareGZipMiddleware(GZipMiddleware):
+    """
+    GZip responses, except streaming endpoints: Starlette's gzip responder does not flush
+    per chunk, so it would hold every streamed event back until the stream ends.
+    """
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].endswith("/stream/"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+# Compress large JSON responses (Textract text is highly repetitive)
+app.add_middleware(StreamAwareGZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -60,4 +107,15 @@ app.include_router(router)
 
 
 if __name__ == "__main__":
-    uvicorn.run("server:app", host="127.0.0.1", port=8002, reload=True)
+    # Auto-reload (single process) only in development; otherwise one worker per core.
+    # "auto" selects uvloop and httptools whenever they are installed
+    dev_mode = settings.env == "dev"
+    uvicorn.run(
+        "server:app",
+        host=settings.host,
+        port=settings.port,
+        loop="auto",
+        http="auto",
+        reload=dev_mode,
+        workers=None if dev_mode else settings.web_concurrency or os.cpu_count() or 1,
+    )
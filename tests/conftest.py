@@ -0,0 +1,10 @@
+import os
+import sys
+
+# The service modules live at the repository root and build their AWS clients at import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+os.environ.setdefault("AWS_REGION", "us-east-1")
+os.environ.setdefault("S3_FORM_BUCKET", "forms")
+os.environ.setdefault("S3_DATA_SCHEMA_BUCKET", "schemas")
@@ -0,0 +1,145 @@
+import asyncio
+import time
+
+import orjson
+import pytest
+
+import text_extractor
+
+
+def test_open_jobs_exceed_submission_concurrency(monkeypatch):
+    file_names = [f"forms/{i}.pdf" for i in range(text_extractor.TEXTRACT_CONCURRENCY * 3)]
+    in_flight = 0
+    peak = 0
+
+    async def start(file_name):
+        return file_name
+
+    async def wait(job_id):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        if in_flight == len(file_names):
+            all_started.set()
+        # Every job stays open until all of them have been submitted
+        await asyncio.wait_for(all_started.wait(), timeout=5)
+        in_flight -= 1
+        return {"Blocks": []}
+
+    async def no_cache(file_name):
+        return None, None
+
+    async def skip_write(cache_key, file_name, text):
+        pass
+
+    monkeypatch.setattr(text_extractor, "start_text_detection_async", start)
+    monkeypatch.setattr(text_extractor, "wait_for_text_detection_async", wait)
+    monkeypatch.setattr(text_extractor, "_aget_cached_text", no_cache)
+    monkeypatch.setattr(text_extractor, "_acache_text", skip_write)
+
+    async def run():
+        nonlocal all_started
+        all_started = asyncio.Event()
+        monkeypatch.setattr(
+            text_extractor, "textract_slots", asyncio.Semaphore(text_extractor.TEXTRACT_CONCURRENCY)
+        )
+        monkeypatch.setattr(
+            text_extractor, "open_job_slots", asyncio.Semaphore(text_extractor.MAX_OPEN_JOBS)
+        )
+        return await text_extractor.extract_text_async(file_names)
+
+    all_started = None
+    result = asyncio.run(run())
+
+    assert peak == len(file_names) > text_extractor.TEXTRACT_CONCURRENCY
+    assert result.count(text_extractor.FORM_TEXT_HEADER) == len(file_names)
+
+
+def _notification(job_id, status="SUCCEEDED", age_ms=0):
+    body = orjson.dumps({"Message": orjson.dumps({"JobId": job_id, "Status": status}).decode()})
+    sent_ms = int(time.time() * 1000) - age_ms
+    return {"Body": body, "ReceiptHandle": job_id, "Attributes": {"SentTimestamp": str(sent_ms)}}
+
+
+class _FakeSQS:
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.deleted = []
+
+    def receive_message(self, **kwargs):
+        received, self.messages = self.messages[:10], self.messages[10:]
+        return {"Messages": received}
+
+    def delete_message_batch(self, QueueUrl, Entries):
+        self.deleted.extend(entry["ReceiptHandle"] for entry in Entries)
+
+
+class _FakeRedis:
+    def __init__(self, available=True):
+        self.values = {}
+        self.available = available
+
+    def get_many_cache(self, keys):
+        if not self.available:
+            raise Exception("Redis unavailable")
+        return [self.values.get(key) for key in keys]
+
+    def set_many_cache(self, items, ttl=3600):
+        if not self.available:
+            raise Exception("Redis unavailable")
+        self.values.update(items)
+        return True
+
+
+def test_completions_for_other_workers_are_shared_and_deleted(monkeypatch):
+    sqs = _FakeSQS([_notification("mine"), _notification("theirs", "FAILED")])
+    redis = _FakeRedis()
+    monkeypatch.setattr(text_extractor, "completion_queue_url", "queue")
+    monkeypatch.setattr(text_extractor, "get_sqs_client", lambda: sqs)
+    monkeypatch.setattr(text_extractor, "redis_client", redis)
+
+    assert text_extractor.drain_completions(["mine"]) == {"mine": "SUCCEEDED"}
+    assert sorted(sqs.deleted) == ["mine", "theirs"]
+
+    # The other worker finds its completion in Redis without another notification
+    assert text_extractor.drain_completions(["theirs"], max_wait=1) == {"theirs": "FAILED"}
+    assert text_extractor._pending_jobs == {}
+
+
+def test_unshared_completions_are_kept_until_stale(monkeypatch):
+    stale_ms = text_extractor.STALE_NOTIFICATION_AGE * 1000 + 1000
+    sqs = _FakeSQS(
+        [_notification("mine"), _notification("fresh"), _notification("stale", age_ms=stale_ms)]
+    )
+    monkeypatch.setattr(text_extractor, "completion_queue_url", "queue")
+    monkeypatch.setattr(text_extractor, "get_sqs_client", lambda: sqs)
+    monkeypatch.setattr(text_extractor, "redis_client", _FakeRedis(available=False))
+
+    assert text_extractor.drain_completions(["mine"]) == {"mine": "SUCCEEDED"}
+    assert sorted(sqs.deleted) == ["mine", "stale"]
+
+
+def test_notified_wait_shares_one_deadline(monkeypatch):
+    drain_waits = []
+
+    async def drain(job_ids, max_wait):
+        drain_waits.append(max_wait)
+        await asyncio.sleep(max_wait)
+        return {job_id: "SUCCEEDED" for job_id in job_ids}
+
+    class Textract:
+        async def get_document_text_detection(self, **kwargs):
+            return {"JobStatus": "IN_PROGRESS"}
+
+    async def get_textract():
+        return Textract()
+
+    monkeypatch.setattr(text_extractor, "completion_queue_url", "queue")
+    monkeypatch.setattr(text_extractor, "drain_completions_async", drain)
+    monkeypatch.setattr(text_extractor, "get_async_textract", get_textract)
+
+    started = time.monotonic()
+    with pytest.raises(Exception, match="Timed out"):
+        asyncio.run(text_extractor.wait_for_text_detection_async("job", initial=0.05, max_wait=0.3))
+    assert drain_waits == [0.3]
+    assert time.monotonic() - started < 0.5
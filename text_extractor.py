@@ -1,30 +1,155 @@
+import asyncio
+import logging
 import os
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import AsyncExitStack
+from functools import lru_cache
 
+import aioboto3
 import boto3
-from dotenv import load_dotenv
+import orjson
+from aiobotocore.config import AioConfig
+from botocore.config import Config
+from botocore.exceptions import NoCredentialsError, ClientError
 
+from config import settings
 from logger import configured_logger
+from redis_facade import redis_client
+from s3_facade import s3
+from textract_parsing import bucket_blocks, extract_form_fields_advanced, map_word_ids
+
+# Fetch credentials and region from settings
+aws_access_key_id = settings.aws_access_key_id
+aws_secret_access_key = settings.aws_secret_access_key
+aws_region = settings.aws_region
+bucket_name = settings.s3_form_bucket
+notification_channel = (
+    {
+        "SNSTopicArn": settings.textract_sns_topic_arn,
+        "RoleArn": settings.textract_role_arn,
+    }
+    if settings.textract_sns_topic_arn and settings.textract_role_arn
+    else None
+)
+completion_queue_url = (
+    settings.textract_sqs_queue_url if notification_channel else None
+)
+
+# Keep-alive connections sized for concurrent callers, and adaptive retries to absorb throttling
+TEXTRACT_CLIENT_OPTIONS = dict(
+    tcp_keepalive=True,
+    retries={"mode": "adaptive", "max_attempts": 10},
+    max_pool_connections=50,
+)
+# The read timeout stays above the 20 s SQS long poll
+SQS_CLIENT_OPTIONS = dict(TEXTRACT_CLIENT_OPTIONS, connect_timeout=5, read_timeout=65)
+
 
-# Load environment variables from .env
-load_dotenv()
+@lru_cache(maxsize=1)
+def get_textract_client():
+    """
+    Get the process-wide Textract client, creating it on first use.
+
+    Building it lazily keeps credential resolution out of import time and lets
+    forked worker processes create their own client instead of inheriting one.
 
-# Fetch credentials and region from environment
-aws_access_key_id = os.getenv("AWS_ACCESS_KEY_ID")
-aws_secret_access_key = os.getenv("AWS_SECRET_ACCESS_KEY")
-aws_region = os.getenv("AWS_REGION")
-bucket_name = os.getenv("S3_FORM_BUCKET")
+    Returns:
+        botocore.client.BaseClient: A thread-safe Textract client shared by every request.
+    """
+    return boto3.client(
+        "textract",
+        aws_access_key_id=aws_access_key_id,
+        aws_secret_access_key=aws_secret_access_key,
+        region_name=aws_region,
+        config=Config(**TEXTRACT_CLIENT_OPTIONS),
+    )
+
+
+@lru_cache(maxsize=1)
+def get_sqs_client():
+    """
+    Get the process-wide SQS client that receives Textract completion notifications.
 
-# Initialize Textract client
-textract = boto3.client(
-    "textract",
+    Returns:
+        botocore.client.BaseClient: A thread-safe SQS client, with a read timeout above the long poll.
+    """
+    return boto3.client(
+        "sqs",
+        aws_access_key_id=aws_access_key_id,
+        aws_secret_access_key=aws_secret_access_key,
+        region_name=aws_region,
+        config=Config(**SQS_CLIENT_OPTIONS),
+    )
+
+# The async client is opened on first use and kept for the life of the process
+async_session = aioboto3.Session(
     aws_access_key_id=aws_access_key_id,
     aws_secret_access_key=aws_secret_access_key,
     region_name=aws_region,
 )
+_async_textract = None
+_async_sqs = None
+_async_exit_stack = AsyncExitStack()
+_async_lock = asyncio.Lock()
+
+# Blocking Textract calls from async handlers run here rather than in the default executor
+textract_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="textract")
+
+# Textract submissions (StartDocumentTextDetection, DetectDocumentText) made concurrently by
+# extract_text_async, kept under the account's rate limits; waiting on a started job doesn't hold one
+TEXTRACT_CONCURRENCY = settings.textract_concurrency
+textract_slots = asyncio.Semaphore(TEXTRACT_CONCURRENCY)
+
+# Asynchronous jobs held open between submission and their terminal status, kept under
+# Textract's open-job limit; submissions beyond it wait here instead of being rejected
+MAX_OPEN_JOBS = settings.textract_max_open_jobs
+open_job_slots = asyncio.Semaphore(MAX_OPEN_JOBS)
+
+# Status checks that come back throttled add this many seconds to the polling interval
+THROTTLE_PENALTY = 1.0
+THROTTLING_ERROR_CODES = frozenset(
+    {"ThrottlingException", "ProvisionedThroughputExceededException"}
+)
 
-import time
-from botocore.exceptions import NoCredentialsError, ClientError
+# A job still running after this long is given up on, freeing its open-job slot and the
+# caller; the file then yields no text rather than holding up the rest of its batch
+JOB_MAX_WAIT = 15 * 60
+
+# Jobs this process is waiting on; whichever thread receives a notification
+# resolves the matching future, so notifications for other jobs aren't lost
+_pending_jobs: dict[str, Future] = {}
+_pending_jobs_lock = threading.Lock()
+
+# Every worker process long-polls the same queue. A completion received by a worker that isn't
+# waiting on the job is recorded in Redis under this prefix for the waiting worker to pick up,
+# and the message is deleted straight away instead of bouncing between workers
+JOB_STATUS_KEY_PREFIX = "textract_job_status:"
+JOB_STATUS_TTL = JOB_MAX_WAIT
 
+# Waiters check Redis for completions recorded by other workers at least this often
+SHARED_STATUS_CHECK_INTERVAL = 5
+
+# Waits are capped at JOB_MAX_WAIT from submission, so a notification still unclaimed this long
+# after it was sent belongs to a job every worker has given up on. If Redis can't take it,
+# it is deleted then instead of being redelivered until the queue's retention period ends
+STALE_NOTIFICATION_AGE = JOB_MAX_WAIT
+
+# Job submissions rejected for throttling or the open-job limit are retried with backoff
+START_RETRY_ATTEMPTS = 6
+START_RETRY_ERROR_CODES = THROTTLING_ERROR_CODES | {"LimitExceededException"}
+
+# Images up to this size are sent to DetectDocumentText inline instead of by S3 reference
+MAX_INLINE_DOCUMENT_BYTES = 5 * 1024 * 1024
+
+# Every successfully processed response starts with this line; error messages do not
+FORM_TEXT_HEADER = "Extracted Form Fields:"
+
+# Extracted text is cached by document content, so identical documents skip Textract
+TEXT_CACHE_TTL = 24 * 3600
+FORM_OBJECT_PREFIX = "forms/"
 
 def start_async_textract_detection(s3_file_name: str) -> str:
     """
@@ -36,42 +161,409 @@ def start_async_textract_detection(s3_file_name: str) -> str:
     Returns:
         str: Job ID to track the status of the detection.
     """
-    try:
-        response = textract.start_document_text_detection(
-            DocumentLocation={"S3Object": {"Bucket": bucket_name, "Name": s3_file_name}}
-        )
-        return response["JobId"]
-    except (NoCredentialsError, ClientError) as e:
-        raise Exception(f"Could not start Textract text detection -> {e}")
+    params = {}
+    if completion_queue_url:
+        params["NotificationChannel"] = notification_channel
+    delay = 1.0
+    for attempt in range(1, START_RETRY_ATTEMPTS + 1):
+        try:
+            response = get_textract_client().start_document_text_detection(
+                DocumentLocation={"S3Object": {"Bucket": bucket_name, "Name": s3_file_name}},
+                **params,
+            )
+            return response["JobId"]
+        except ClientError as e:
+            time.sleep(_start_retry_wait(e, attempt, delay, s3_file_name))
+            delay = min(30.0, delay * 2)
+        except NoCredentialsError as e:
+            raise Exception(f"Could not start Textract text detection -> {e}")
+
+
+def _start_retry_wait(e: ClientError, attempt: int, delay: float, s3_file_name: str) -> float:
+    """
+    Decide how a rejected job submission is retried.
 
+    Args:
+        e (ClientError): The error the submission failed with.
+        attempt (int): The attempt that failed, starting at 1.
+        delay (float): Current backoff delay in seconds.
+        s3_file_name (str): The document the job was for.
+
+    Returns:
+        float: Seconds to wait, with jitter, before the next attempt.
 
-def get_async_textract_results(job_id: str) -> dict:
+    Raises:
+        Exception: If the error isn't retryable or the attempts are used up.
+    """
+    code = e.response["Error"]["Code"]
+    if code not in START_RETRY_ERROR_CODES or attempt == START_RETRY_ATTEMPTS:
+        raise Exception(f"Could not start Textract text detection -> {e}")
+    configured_logger.warning(
+        f"Textract rejected the job for {s3_file_name} ({code}); retrying in {delay:.1f}s"
+    )
+    return delay + random.uniform(0, delay * 0.1)
+
+
+def get_async_textract_results(
+    job_id: str,
+    initial: float = 0.5,
+    cap: float = 30.0,
+    factor: float = 2.0,
+    max_wait: float = JOB_MAX_WAIT,
+) -> dict:
     """
     Retrieve the results of the asynchronous Textract text detection.
 
+    Polls with truncated exponential backoff and jitter: small documents are picked
+    up within a second, while long jobs are checked less and less often so they stay
+    within the GetDocumentTextDetection TPS quota.
+
     Args:
         job_id (str): The Job ID of the Textract detection.
+        initial (float): Seconds to wait before the second status check.
+        cap (float): Upper bound on the wait between checks.
+        factor (float): Growth factor applied to the wait after each check.
+        max_wait (float): Seconds after which the job is given up on.
 
     Returns:
         dict: Textract text detection result.
     """
+    delay = initial
+    deadline = time.monotonic() + max_wait
+    while True:
+        if time.monotonic() > deadline:
+            raise Exception(f"Timed out waiting for Textract job {job_id}")
+        try:
+            result = get_textract_client().get_document_text_detection(JobId=job_id)
+        except ClientError as e:
+            if e.response["Error"]["Code"] not in THROTTLING_ERROR_CODES:
+                raise Exception(f"Error fetching Textract results -> {e}")
+            # Throttled: back off further than the schedule before asking again
+            delay = min(cap, delay + THROTTLE_PENALTY)
+            configured_logger.warning(f"Textract job {job_id} status check throttled; retrying in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+        except NoCredentialsError as e:
+            raise Exception(f"Error fetching Textract results -> {e}")
+
+        status = result["JobStatus"]
+        if status == "SUCCEEDED":
+            configured_logger.info(f"Textract job {job_id} succeeded.")
+            return result
+        elif status == "FAILED":
+            configured_logger.info(f"Textract job {job_id} failed.")
+            raise Exception("Textract text detection failed.")
+
+        configured_logger.debug("Waiting for job to complete...")
+        time.sleep(delay + random.uniform(0, delay * 0.1))
+        delay = min(cap, delay * factor)
+
+
+def _resolve_job(job_id: str, status: str) -> bool:
+    """Hand a job's final status to its waiter in this process, if there is one."""
+    with _pending_jobs_lock:
+        waiting = _pending_jobs.pop(job_id, None)
+        if waiting is None:
+            return False
+        if not waiting.done():
+            waiting.set_result(status)
+        return True
+
+
+def _claim_notifications(messages):
+    """
+    Resolve the waiting jobs named by received completion notifications.
+
+    Args:
+        messages (list): Messages from an SQS ReceiveMessage call.
+
+    Returns:
+        tuple: DeleteMessageBatch entries for claimed and malformed messages, and the
+        completions of jobs no one in this process waits on, as
+        {job_id: (status, entry, sent_ms)}.
+    """
+    handled = []
+    unclaimed = {}
+    for i, message in enumerate(messages):
+        entry = {"Id": str(i), "ReceiptHandle": message["ReceiptHandle"]}
+        try:
+            # SNS wraps the Textract notification in its own envelope
+            notification = orjson.loads(orjson.loads(message["Body"])["Message"])
+            job_id, status = notification["JobId"], notification["Status"]
+        except (orjson.JSONDecodeError, KeyError, TypeError) as e:
+            configured_logger.warning(f"Discarding malformed Textract notification -> {e}")
+            handled.append(entry)
+            continue
+
+        if _resolve_job(job_id, status):
+            handled.append(entry)
+        else:
+            sent_ms = int(message.get("Attributes", {}).get("SentTimestamp", time.time() * 1000))
+            unclaimed[job_id] = (status, entry, sent_ms)
+    return handled, unclaimed
+
+
+def _shared_statuses(unclaimed: dict) -> dict:
+    return {JOB_STATUS_KEY_PREFIX + job_id: status for job_id, (status, _, _) in unclaimed.items()}
+
+
+def _stale_entries(unclaimed: dict) -> list:
+    # Used when the completions couldn't be shared: only messages no worker can still claim go
+    now_ms = time.time() * 1000
+    return [
+        entry
+        for _, entry, sent_ms in unclaimed.values()
+        if now_ms - sent_ms >= STALE_NOTIFICATION_AGE * 1000
+    ]
+
+
+def _resolve_shared(job_ids: list, statuses: list):
+    for job_id, status in zip(job_ids, statuses):
+        if status is not None:
+            _resolve_job(job_id, status)
+
+
+def _register_waits(job_ids) -> dict:
+    with _pending_jobs_lock:
+        return {job_id: _pending_jobs.setdefault(job_id, Future()) for job_id in job_ids}
+
+
+def _unregister_waits(job_ids):
+    with _pending_jobs_lock:
+        for job_id in job_ids:
+            _pending_jobs.pop(job_id, None)
+
+
+def _waiting_on(futures: dict) -> list:
+    return [job_id for job_id, future in futures.items() if not future.done()]
+
+
+def _next_receive_wait(futures: dict, deadline: float) -> int:
+    # Short enough long polls that completions recorded by other workers are noticed promptly,
+    # and never past the deadline
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise Exception(f"Timed out waiting for Textract jobs {_waiting_on(futures)}")
+    return max(1, min(SHARED_STATUS_CHECK_INTERVAL, int(remaining)))
+
+
+def drain_completions(job_ids, max_wait: float = JOB_MAX_WAIT) -> dict:
+    """
+    Wait for the completion notifications of Textract jobs.
+
+    Long-polls the SQS queue subscribed to the jobs' SNS topic instead of calling
+    the Get APIs until each job finishes, receiving up to ten notifications per call.
+    Every received notification is deleted: those for jobs other waiters in this process
+    are on are handed to them, and those for other workers' jobs are recorded in Redis,
+    where their waiters look them up.
+
+    Args:
+        job_ids (Iterable[str]): Job IDs of text detection or analysis jobs started
+            with the notification channel.
+        max_wait (float): Seconds after which the remaining jobs are given up on;
+            at most JOB_MAX_WAIT, after which completions are discarded.
+
+    Returns:
+        dict: Final job status ("SUCCEEDED", "FAILED", ...) by Job ID.
+    """
+    job_ids = list(job_ids)
+    futures = _register_waits(job_ids)
+    sqs = get_sqs_client()
+    deadline = time.monotonic() + max_wait
     try:
-        while True:
-            result = textract.get_document_text_detection(JobId=job_id)
-            status = result["JobStatus"]
-
-            if status == "SUCCEEDED":
-                configured_logger.info(f"Textract job {job_id} succeeded.")
-                return result
-            elif status == "FAILED":
-                configured_logger.info(f"Textract job {job_id} failed.")
-                raise Exception("Textract text detection failed.")
+        while waiting_on := _waiting_on(futures):
+            try:
+                _resolve_shared(
+                    waiting_on,
+                    redis_client.get_many_cache([JOB_STATUS_KEY_PREFIX + i for i in waiting_on]),
+                )
+            except Exception as e:
+                configured_logger.warning("Textract job status lookup failed: %s", e)
+            if not _waiting_on(futures):
+                break
+
+            try:
+                received = sqs.receive_message(
+                    QueueUrl=completion_queue_url,
+                    MaxNumberOfMessages=10,
+                    WaitTimeSeconds=_next_receive_wait(futures, deadline),
+                    MessageSystemAttributeNames=["SentTimestamp"],
+                )
+                handled, unclaimed = _claim_notifications(received.get("Messages", []))
+                if unclaimed:
+                    try:
+                        redis_client.set_many_cache(_shared_statuses(unclaimed), ttl=JOB_STATUS_TTL)
+                        handled.extend(entry for _, entry, _ in unclaimed.values())
+                    except Exception as e:
+                        configured_logger.warning("Could not share Textract job statuses: %s", e)
+                        handled.extend(_stale_entries(unclaimed))
+                if handled:
+                    sqs.delete_message_batch(QueueUrl=completion_queue_url, Entries=handled)
+            except (NoCredentialsError, ClientError) as e:
+                raise Exception(f"Error receiving Textract notifications -> {e}")
+
+        return {job_id: future.result() for job_id, future in futures.items()}
+    finally:
+        _unregister_waits(job_ids)
+
+
+async def drain_completions_async(job_ids, max_wait: float = JOB_MAX_WAIT) -> dict:
+    """Async variant of drain_completions: the long polls don't hold a thread."""
+    job_ids = list(job_ids)
+    futures = _register_waits(job_ids)
+    sqs = await get_async_sqs()
+    deadline = time.monotonic() + max_wait
+    try:
+        while waiting_on := _waiting_on(futures):
+            try:
+                _resolve_shared(
+                    waiting_on,
+                    await redis_client.aget_many_cache(
+                        [JOB_STATUS_KEY_PREFIX + i for i in waiting_on]
+                    ),
+                )
+            except Exception as e:
+                configured_logger.warning("Textract job status lookup failed: %s", e)
+            if not _waiting_on(futures):
+                break
+
+            try:
+                received = await sqs.receive_message(
+                    QueueUrl=completion_queue_url,
+                    MaxNumberOfMessages=10,
+                    WaitTimeSeconds=_next_receive_wait(futures, deadline),
+                    MessageSystemAttributeNames=["SentTimestamp"],
+                )
+                handled, unclaimed = _claim_notifications(received.get("Messages", []))
+                if unclaimed:
+                    try:
+                        await redis_client.aset_many_cache(
+                            _shared_statuses(unclaimed), ttl=JOB_STATUS_TTL
+                        )
+                        handled.extend(entry for _, entry, _ in unclaimed.values())
+                    except Exception as e:
+                        configured_logger.warning("Could not share Textract job statuses: %s", e)
+                        handled.extend(_stale_entries(unclaimed))
+                if handled:
+                    await sqs.delete_message_batch(QueueUrl=completion_queue_url, Entries=handled)
+            except (NoCredentialsError, ClientError) as e:
+                raise Exception(f"Error receiving Textract notifications -> {e}")
+
+        return {job_id: future.result() for job_id, future in futures.items()}
+    finally:
+        _unregister_waits(job_ids)
+
+
+def iter_result_blocks(job_id: str, first_page: dict):
+    """
+    Yield the blocks of every result page of a finished text detection job.
+
+    Args:
+        job_id (str): The Job ID of the Textract detection.
+        first_page (dict): The first page of results, as returned by get_async_textract_results.
+
+    Yields:
+        dict: Textract blocks, page by page.
+    """
+    yield from first_page["Blocks"]
+    next_token = first_page.get("NextToken")
+    while next_token:
+        page = get_textract_client().get_document_text_detection(JobId=job_id, NextToken=next_token)
+        yield from page["Blocks"]
+        next_token = page.get("NextToken")
 
-            configured_logger.info("Waiting for job to complete...")
-            time.sleep(5)  # Sleep for 5 seconds before checking again
 
-    except (NoCredentialsError, ClientError) as e:
-        raise Exception(f"Error fetching Textract results -> {e}")
+async def start_text_detection_async(s3_file_name: str) -> str:
+    """
+    Async variant of start_async_textract_detection using the shared aioboto3 client.
+
+    Args:
+        s3_file_name (str): The S3 file name (path) of the document to detect text from.
+
+    Returns:
+        str: Job ID to track the status of the detection.
+    """
+    params = {}
+    if completion_queue_url:
+        params["NotificationChannel"] = notification_channel
+    client = await get_async_textract()
+    delay = 1.0
+    for attempt in range(1, START_RETRY_ATTEMPTS + 1):
+        try:
+            response = await client.start_document_text_detection(
+                DocumentLocation={"S3Object": {"Bucket": bucket_name, "Name": s3_file_name}},
+                **params,
+            )
+            return response["JobId"]
+        except ClientError as e:
+            await asyncio.sleep(_start_retry_wait(e, attempt, delay, s3_file_name))
+            delay = min(30.0, delay * 2)
+        except NoCredentialsError as e:
+            raise Exception(f"Could not start Textract text detection -> {e}")
+
+
+async def wait_for_text_detection_async(
+    job_id: str,
+    initial: float = 0.5,
+    cap: float = 30.0,
+    factor: float = 2.0,
+    max_wait: float = JOB_MAX_WAIT,
+) -> dict:
+    """
+    Async variant of get_async_textract_results: the backoff waits don't hold a thread,
+    and the blocks of every result page are returned together. Jobs started with the
+    notification channel are awaited over SQS and then checked once.
+
+    Args:
+        job_id (str): The Job ID of the Textract detection.
+        initial (float): Seconds to wait before the second status check.
+        cap (float): Upper bound on the wait between checks.
+        factor (float): Growth factor applied to the wait after each check.
+        max_wait (float): Seconds after which the job is given up on.
+
+    Returns:
+        dict: Textract text detection result.
+    """
+    client = await get_async_textract()
+    # One budget for the notification wait and the status checks together
+    deadline = time.monotonic() + max_wait
+    if completion_queue_url:
+        # Once notified, the first status check below finds the job finished
+        await drain_completions_async([job_id], max_wait=max_wait)
+    delay = initial
+    while True:
+        if time.monotonic() > deadline:
+            raise Exception(f"Timed out waiting for Textract job {job_id}")
+        try:
+            result = await client.get_document_text_detection(JobId=job_id)
+        except ClientError as e:
+            if e.response["Error"]["Code"] not in THROTTLING_ERROR_CODES:
+                raise Exception(f"Error fetching Textract results -> {e}")
+            delay = min(cap, delay + THROTTLE_PENALTY)
+            configured_logger.warning(f"Textract job {job_id} status check throttled; retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            continue
+        except NoCredentialsError as e:
+            raise Exception(f"Error fetching Textract results -> {e}")
+
+        status = result["JobStatus"]
+        if status == "SUCCEEDED":
+            configured_logger.info(f"Textract job {job_id} succeeded.")
+            # Multi-page documents come back in pages; gather the blocks of all of them
+            blocks = result["Blocks"]
+            next_token = result.get("NextToken")
+            while next_token:
+                page = await client.get_document_text_detection(JobId=job_id, NextToken=next_token)
+                blocks.extend(page["Blocks"])
+                next_token = page.get("NextToken")
+            return {**result, "Blocks": blocks}
+        elif status == "FAILED":
+            configured_logger.info(f"Textract job {job_id} failed.")
+            raise Exception("Textract text detection failed.")
+
+        configured_logger.debug("Waiting for job to complete...")
+        await asyncio.sleep(delay + random.uniform(0, delay * 0.1))
+        delay = min(cap, delay * factor)
 
 
 def extract_text_by_type(response, block_type="LINE"):
@@ -86,11 +578,7 @@ def extract_text_by_type(response, block_type="LINE"):
         list: Extracted text blocks
     """
     try:
-        text_blocks = []
-        for block in response["Blocks"]:
-            if block["BlockType"] == block_type:
-                text_blocks.append(block["Text"])
-        return text_blocks
+        return [block["Text"] for block in response["Blocks"] if block["BlockType"] == block_type]
     except Exception as e:
         raise Exception(f"Error occurred while extracting text by type {block_type} -> {str(e)}") from e
 
@@ -103,41 +591,25 @@ def async_text_detection(s3_file_name: str) -> str:
         s3_file_name (str): The S3 file name (path) of the document to analyze.
 
     Returns:
-        dict: Extracted text results by type
+        str: The formatted text of the document
     """
     try:
         # Start the asynchronous Textract text detection
         job_id = start_async_textract_detection(s3_file_name)
 
-        # Get the results once the job is complete
-        response = get_async_textract_results(job_id)
-        text_output = []
-
-        # Log the extracted data
-        configured_logger.info(f"Extracted data from {s3_file_name}")
-
-        return process_response(response)
-        word_map = map_word_ids(response)
-        lines = extract_text_by_type(response, "LINE"),
-        form_fields = extract_form_fields_advanced(response, word_map),
-
-        # Format form fields
-        text_output.append("Extracted Form Fields:")
-        for key, value in form_fields.items():
-            text_output.append(f"- {key}: {value}")
-
-        text_output.append("\nExtracted Text Lines:")
-        text_output.extend(lines)
-
-        # Combine all text
-        formatted_text = "\n".join(text_output)
+        # Get the results once the job is complete, notified over SQS when configured
+        if completion_queue_url:
+            if drain_completions([job_id])[job_id] != "SUCCEEDED":
+                raise Exception("Textract text detection failed.")
+            response = get_textract_client().get_document_text_detection(JobId=job_id)
+        else:
+            response = get_async_textract_results(job_id)
 
         # Log the extracted data
         configured_logger.info(f"Extracted data from {s3_file_name}")
-        print(formatted_text)
-
-        return formatted_text
 
+        # Later result pages are fetched as the parser reaches them
+        return process_response(iter_result_blocks(job_id, response))
 
     except Exception as e:
         raise Exception(f"Could not extract text using Textract -> {e}")
@@ -147,12 +619,14 @@ def process_response(response):
     try:
         text_output = []
 
-        word_map = map_word_ids(response)
-        lines = extract_text_by_type(response, "LINE")
-        form_fields = extract_form_fields_advanced(response, word_map)
+        # One pass over the blocks sorts them by type for the lookups below
+        blocks = bucket_blocks(response)
+        word_map = map_word_ids(blocks)
+        lines = blocks["lines"]
+        form_fields = extract_form_fields_advanced(blocks, word_map)
 
         # Format form fields
-        text_output.append("Extracted Form Fields:")
+        text_output.append(FORM_TEXT_HEADER)
         for key, value in form_fields.items():
             text_output.append(f"- {key}: {value}")
 
@@ -162,235 +636,323 @@ def process_response(response):
         # Combine all text
         formatted_text = "\n".join(text_output)
 
-        print(formatted_text)
+        if configured_logger.isEnabledFor(logging.DEBUG):
+            configured_logger.debug("word_map size=%d, formatted text:\n%s", len(word_map), formatted_text)
 
         return formatted_text
     except Exception as e:
         raise Exception(f"Error occurred while processing ocr response into form data --> {str(e)}")
 
 
+async def get_async_textract():
+    global _async_textract
+    if _async_textract is None:
+        async with _async_lock:
+            if _async_textract is None:
+                _async_textract = await _async_exit_stack.enter_async_context(
+                    async_session.client("textract", config=AioConfig(**TEXTRACT_CLIENT_OPTIONS))
+                )
+    return _async_textract
+
+
+async def get_async_sqs():
+    global _async_sqs
+    if _async_sqs is None:
+        async with _async_lock:
+            if _async_sqs is None:
+                _async_sqs = await _async_exit_stack.enter_async_context(
+                    async_session.client("sqs", config=AioConfig(**SQS_CLIENT_OPTIONS))
+                )
+    return _async_sqs
+
+
+async def close_async_textract():
+    global _async_textract, _async_sqs
+    await _async_exit_stack.aclose()
+    _async_textract = None
+    _async_sqs = None
+
+
 def sync_text_detection(s3_file_name: str):
+    return detect_document_text({"S3Object": {"Bucket": bucket_name, "Name": s3_file_name}})
+
+
+def sync_text_detection_bytes(file_bytes: bytes):
+    """
+    Runs DetectDocumentText on a document held in memory, without reading it back from S3.
+
+    Args:
+        file_bytes (bytes): The document content, at most MAX_INLINE_DOCUMENT_BYTES.
+    """
+    return detect_document_text({"Bytes": file_bytes})
+
+
+def _client_error_message(e: ClientError) -> str:
+    # Handle AWS client errors such as permission or service issues
+    error_code = e.response["Error"]["Code"]
+    if error_code == "AccessDeniedException":
+        return "Access Denied: You do not have permission to access the S3 object."
+    elif error_code == "InvalidS3ObjectException":
+        return "Invalid S3 Object: Unable to access the specified S3 object."
+    elif error_code == "UnsupportedDocumentException":
+        return "Unsupported Document Format: The document format is not supported by Textract."
+    elif error_code == "DocumentTooLargeException":
+        return "Document Too Large: The document exceeds the size limit for processing."
+    elif error_code == "BadDocumentException":
+        return "Bad Document: Textract cannot read the document."
+    elif error_code == "InvalidParameterException":
+        return "Invalid Parameter: One or more input parameters are invalid."
+    elif error_code == "InternalServerError":
+        return (
+            "Internal Server Error: There was a problem with the Textract service."
+        )
+    elif error_code == "ThrottlingException":
+        return "Throttling Exception: Too many requests to the Textract service."
+    else:
+        return f"An error occurred: {error_code} - {e.response['Error']['Message']}"
+
+
+def detect_document_text(document: dict):
     try:
         # Call DetectDocumentText to extract text from the document
-        response = textract.detect_document_text(
-            Document={"S3Object": {"Bucket": bucket_name, "Name": s3_file_name}}
-        )
+        response = get_textract_client().detect_document_text(Document=document)
 
         return process_response(response)
-        extract_text_by_type(response, "LINE")
 
+    except ClientError as e:
+        return _client_error_message(e)
+
+    except Exception as e:
+        # Catch any other exceptions that may occur
+        return f"An unexpected error occurred -> {str(e)}"
+
+
+async def detect_document_text_async(document: dict):
+    """Async variant of detect_document_text using the shared aioboto3 client."""
+    try:
+        client = await get_async_textract()
+        response = await client.detect_document_text(Document=document)
+
+        # Parsing is CPU work; keep it off the event loop
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(textract_executor, process_response, response)
 
     except ClientError as e:
-        # Handle AWS client errors such as permission or service issues
-        error_code = e.response["Error"]["Code"]
-        if error_code == "AccessDeniedException":
-            return "Access Denied: You do not have permission to access the S3 object."
-        elif error_code == "InvalidS3ObjectException":
-            return "Invalid S3 Object: Unable to access the specified S3 object."
-        elif error_code == "UnsupportedDocumentException":
-            return "Unsupported Document Format: The document format is not supported by Textract."
-        elif error_code == "DocumentTooLargeException":
-            return "Document Too Large: The document exceeds the size limit for processing."
-        elif error_code == "BadDocumentException":
-            return "Bad Document: Textract cannot read the document."
-        elif error_code == "InvalidParameterException":
-            return "Invalid Parameter: One or more input parameters are invalid."
-        elif error_code == "InternalServerError":
-            return (
-                "Internal Server Error: There was a problem with the Textract service."
-            )
-        elif error_code == "ThrottlingException":
-            return "Throttling Exception: Too many requests to the Textract service."
-        else:
-            return f"An error occurred: {error_code} - {e.response['Error']['Message']}"
+        return _client_error_message(e)
 
     except Exception as e:
         # Catch any other exceptions that may occur
         return f"An unexpected error occurred -> {str(e)}"
 
 
-def extract_form_fields_advanced(response, word_map):
+def _text_cache_key_from_name(file_name: str):
+    # Forms are stored under forms/<content hash><ext>, the same hash the router caches by
+    if file_name.startswith(FORM_OBJECT_PREFIX):
+        return f"extract_text:{os.path.splitext(file_name[len(FORM_OBJECT_PREFIX):])[0]}"
+    return None
+
+
+def _text_cache_key_from_etag(etag: str) -> str:
+    return "extract_text:etag:" + etag.strip('"')
+
+
+def text_cache_key(file_name: str) -> str:
     """
-    Advanced form field extraction from Textract response.
+    Build the cache key for a document's extracted text from its content.
 
     Args:
-        response (dict): Textract response
-        word_map (dict): Mapping of word IDs to their text
+        file_name (str): The S3 file name.
 
     Returns:
-        dict: Extracted form fields
-    """
-    key_map = {}
-    value_map = {}
-    final_map = {}
-
-    print(word_map)
-
-    # First pass: create key and value maps
-    for block in response["Blocks"]:
-        if block["BlockType"] == "KEY_VALUE_SET":
-            if "KEY" in block.get("EntityTypes", []):
-                # Process key
-                key_text = ""
-                if "Relationships" in block:
-                    for relation in block["Relationships"]:
-                        if relation["Type"] == "CHILD":
-                            key_text = " ".join(
-                                [word_map.get(i, "") for i in relation["Ids"]]
-                            )
-
-                # Find associated value IDs
-                value_ids = []
-                for relation in block.get("Relationships", []):
-                    if relation["Type"] == "VALUE":
-                        value_ids = relation["Ids"]
-
-                if key_text:
-                    key_map[key_text] = value_ids
-
-            elif "VALUE" in block.get("EntityTypes", []):
-                # Process value
-                if "Relationships" in block:
-                    for relation in block["Relationships"]:
-                        if relation["Type"] == "CHILD":
-                            value_text = " ".join(
-                                [word_map.get(i, "") for i in relation["Ids"]]
-                            )
-                            value_map[block["Id"]] = value_text
-
-    # Second pass: combine keys and values
-    for key, value_ids in key_map.items():
-        value_text = " ".join([value_map.get(vid, "N/A") for vid in value_ids])
-        final_map[key] = value_text.strip()
-
-    return final_map
-
-
-def map_word_ids(response):
-    """
-    Create a mapping of word and selection IDs to their text or status.
+        str: The key naming the document's content hash, or its ETag for other objects.
+    """
+    # Keys outside forms/ cost one HEAD request, far less than the Textract job it can save
+    cache_key = _text_cache_key_from_name(file_name)
+    if cache_key is None:
+        head = s3.s3.head_object(Bucket=bucket_name, Key=file_name)
+        cache_key = _text_cache_key_from_etag(head["ETag"])
+    return cache_key
+
+
+async def text_cache_key_async(file_name: str) -> str:
+    """Async variant of text_cache_key."""
+    cache_key = _text_cache_key_from_name(file_name)
+    if cache_key is None:
+        client = await s3.get_async_s3()
+        head = await client.head_object(Bucket=bucket_name, Key=file_name)
+        cache_key = _text_cache_key_from_etag(head["ETag"])
+    return cache_key
 
-    Args:
-        response (dict): Textract response
+
+def _get_cached_text(file_name: str):
+    """
+    Look the document's extracted text up in Redis.
 
     Returns:
-        dict: Mapping of block IDs to their text or selection status
+        tuple: The cache key, or None if it couldn't be built, and the cached text, or
+        None on a miss or if S3 or Redis is unavailable.
     """
-    word_map = {}
-    for block in response["Blocks"]:
-        if block["BlockType"] == "WORD":
-            word_map[block["Id"]] = block["Text"]
-        if block["BlockType"] == "SELECTION_ELEMENT":
-            word_map[block["Id"]] = block["SelectionStatus"]
+    try:
+        cache_key = text_cache_key(file_name)
+    except Exception as e:
+        configured_logger.warning("Text cache key lookup failed for '%s': %s", file_name, e)
+        return None, None
+    try:
+        return cache_key, redis_client.get_cache(cache_key)
+    except Exception as e:
+        configured_logger.warning("Text cache lookup failed for '%s': %s", file_name, e)
+        return cache_key, None
+
 
-    print("Word Map: ", word_map)
-    return word_map
+async def _aget_cached_text(file_name: str):
+    try:
+        cache_key = await text_cache_key_async(file_name)
+    except Exception as e:
+        configured_logger.warning("Text cache key lookup failed for '%s': %s", file_name, e)
+        return None, None
+    try:
+        return cache_key, await redis_client.aget_cache(cache_key)
+    except Exception as e:
+        configured_logger.warning("Text cache lookup failed for '%s': %s", file_name, e)
+        return cache_key, None
 
 
-def extract_form_fields_advanced(response, word_map):
+def _cache_text(cache_key, file_name: str, text: str):
+    """Share a successful extraction through Redis; failing to is only logged."""
+    # Textract errors come back as messages rather than exceptions; only cache real extractions
+    if cache_key is None or not text.startswith(FORM_TEXT_HEADER):
+        return
+    try:
+        redis_client.set_cache(cache_key, text, ttl=TEXT_CACHE_TTL)
+    except Exception as e:
+        configured_logger.warning("Could not cache text extraction for '%s': %s", file_name, e)
+
+
+async def _acache_text(cache_key, file_name: str, text: str):
+    if cache_key is None or not text.startswith(FORM_TEXT_HEADER):
+        return
+    try:
+        await redis_client.aset_cache(cache_key, text, ttl=TEXT_CACHE_TTL)
+    except Exception as e:
+        configured_logger.warning("Could not cache text extraction for '%s': %s", file_name, e)
+
+
+def extract_file_text(file_name: str) -> str:
     """
-    Advanced form field extraction from Textract response.
+    Extracts the text of one S3 document. Uses asynchronous text detection for PDFs
+    and DetectDocumentText for images.
 
     Args:
-        response (dict): Textract response
-        word_map (dict): Mapping of word IDs to their text
+        file_name (str): The S3 file name.
 
     Returns:
-        dict: Extracted form fields
-    """
-    key_map = {}
-    value_map = {}
-    final_map = {}
-
-    # First pass: create key and value maps
-    for block in response["Blocks"]:
-        if block["BlockType"] == "KEY_VALUE_SET":
-            if "KEY" in block.get("EntityTypes", []):
-                # Process key
-                key_text = ""
-                if "Relationships" in block:
-                    for relation in block["Relationships"]:
-                        if relation["Type"] == "CHILD":
-                            key_text = " ".join(
-                                [word_map.get(i, "") for i in relation["Ids"]]
-                            )
-
-                # Find associated value IDs
-                value_ids = []
-                for relation in block.get("Relationships", []):
-                    if relation["Type"] == "VALUE":
-                        value_ids = relation["Ids"]
-
-                if key_text:
-                    key_map[key_text] = value_ids
-
-            elif "VALUE" in block.get("EntityTypes", []):
-                # Process value
-                if "Relationships" in block:
-                    for relation in block["Relationships"]:
-                        if relation["Type"] == "CHILD":
-                            value_text = " ".join(
-                                [word_map.get(i, "") for i in relation["Ids"]]
-                            )
-                            value_map[block["Id"]] = value_text
-
-    # Second pass: combine keys and values
-    for key, value_ids in key_map.items():
-        value_text = " ".join([value_map.get(vid, "N/A") for vid in value_ids])
-        final_map[key] = value_text.strip()
-
-    return final_map
-
-
-def map_word_ids(response):
-    """
-    Create a mapping of word and selection IDs to their text or status.
+        str: The formatted text, or an empty string if extraction failed.
+    """
+    cache_key, cached = _get_cached_text(file_name)
+    if cached is not None:
+        configured_logger.info(f"Returning cached text extraction for {file_name}")
+        return cached
+
+    try:
+        if file_name.lower().endswith(".pdf"):
+            # Handle PDF files with asynchronous Textract API
+            configured_logger.info(f"Processing PDF: {file_name}")
+            result = async_text_detection(file_name)
+        else:
+            # Handle images with synchronous Textract API
+            configured_logger.info(f"Processing image: {file_name}")
+            result = sync_text_detection(file_name)
+
+        configured_logger.info(f"Text detection completed for {file_name}.")
+
+    except Exception as e:
+        # Log the error and print the exception message
+        configured_logger.error(f"Error processing file {file_name} -> {str(e)}")
+        return ""
+
+    _cache_text(cache_key, file_name, result)
+    return result
+
+
+async def extract_file_text_async(file_name: str) -> str:
+    """
+    Async variant of extract_file_text: job submission, polling and detection are
+    awaited on the shared aioboto3 client instead of blocking a worker thread.
 
     Args:
-        response (dict): Textract response
+        file_name (str): The S3 file name.
 
     Returns:
-        dict: Mapping of block IDs to their text or selection status
+        str: The formatted text, or an empty string if extraction failed.
     """
-    word_map = {}
-    for block in response["Blocks"]:
-        if block["BlockType"] == "WORD":
-            word_map[block["Id"]] = block["Text"]
-        if block["BlockType"] == "SELECTION_ELEMENT":
-            word_map[block["Id"]] = block["SelectionStatus"]
-    return word_map
+    cache_key, cached = await _aget_cached_text(file_name)
+    if cached is not None:
+        configured_logger.info(f"Returning cached text extraction for {file_name}")
+        return cached
+
+    try:
+        if file_name.lower().endswith(".pdf"):
+            configured_logger.info(f"Processing PDF: {file_name}")
+            # The slot is held from submission until the job succeeds, fails or times out,
+            # and is released on any exception
+            async with open_job_slots:
+                async with textract_slots:
+                    job_id = await start_text_detection_async(file_name)
+                response = await wait_for_text_detection_async(job_id)
+            configured_logger.info(f"Extracted data from {file_name}")
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(textract_executor, process_response, response)
+        else:
+            configured_logger.info(f"Processing image: {file_name}")
+            async with textract_slots:
+                result = await detect_document_text_async(
+                    {"S3Object": {"Bucket": bucket_name, "Name": file_name}}
+                )
+
+        configured_logger.info(f"Text detection completed for {file_name}.")
+
+    except Exception as e:
+        configured_logger.error(f"Error processing file {file_name} -> {str(e)}")
+        return ""
+
+    await _acache_text(cache_key, file_name, result)
+    return result
 
 
-def extract_text(file_names):
+def extract_text(file_names, max_workers=8):
     """
-    Processes a list of file names from S3. Uses StartDocumentTextDetection for images
-    and StartDocumentAnalysis for PDFs.
+    Processes a list of file names from S3. Uses StartDocumentTextDetection for PDFs
+    and DetectDocumentText for images.
+
+    The files are processed on their own thread pool, so their Textract calls overlap;
+    a file that fails contributes an empty string rather than aborting the others.
 
     Args:
         file_names (list): List of S3 file names.
+        max_workers (int): Maximum number of files processed at once.
 
     Returns:
-        None
+        str: The extracted text of all files, in order.
     """
-    response = ""
-    for file_name in file_names:
-        try:
-            if file_name.lower().endswith(".pdf"):
-                # Handle PDF files with synchronous Textract API
-                configured_logger.info(f"Processing PDF: {file_name}")
-                result = async_text_detection(file_name)
-                configured_logger.info(
-                    f"Text detection completed for {file_name}. Response: {result}"
-                )
-            else:
-                # Handle images with asynchronous Textract API
-                configured_logger.info(f"Processing image: {file_name}")
-                result = sync_text_detection(file_name)
-                configured_logger.info(
-                    f"Text detection completed for {file_name}. Response: {result}"
-                )
+    if len(file_names) <= 1:
+        return "\n\n".join(extract_file_text(file_name) for file_name in file_names)
 
-        except Exception as e:
-            # Log the error and print the exception message
-            configured_logger.error(f"Error processing file {file_name} -> {str(e)}")
-    return response
+    # A pool of its own rather than textract_executor, which extract_text may itself be running on
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(file_names))) as executor:
+        return "\n\n".join(executor.map(extract_file_text, file_names))
+
+
+async def extract_text_async(file_names):
+    """
+    Async variant of extract_text that processes the files concurrently on the aioboto3
+    client. Across all requests, at most TEXTRACT_CONCURRENCY submissions are made at once
+    and at most MAX_OPEN_JOBS jobs are open.
+
+    Args:
+        file_names (list): List of S3 file names.
+
+    Returns:
+        str: The extracted text of all files, in order.
+    """
+    results = await asyncio.gather(*(extract_file_text_async(file_name) for file_name in file_names))
+    return "\n\n".join(results)
@@ -1,277 +1,292 @@
-import boto3
-import os
-import uuid
+import logging
+import orjson
+import random
+import threading
 import time
-from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from config import settings
 from logger import configured_logger
 from botocore.exceptions import NoCredentialsError, ClientError
+from redis_facade import redis_client
 from s3_facade import s3
-
-# Load environment variables from .env
-load_dotenv()
-
-# Fetch credentials and region from environment
-aws_access_key_id = os.getenv("AWS_ACCESS_KEY_ID")
-aws_secret_access_key = os.getenv("AWS_SECRET_ACCESS_KEY")
-aws_region = os.getenv("AWS_REGION")
-bucket_name = os.getenv("S3_FORM_BUCKET")
-
-# Initialize Textract client
-textract = boto3.client(
-    "textract",
-    aws_access_key_id=aws_access_key_id,
-    aws_secret_access_key=aws_secret_access_key,
-    region_name=aws_region,
+from text_extractor import (
+    JOB_MAX_WAIT,
+    completion_queue_url,
+    drain_completions,
+    get_textract_client,
+    notification_channel,
 )
+from textract_parsing import format_analysis
+
+# Fetch credentials and region from settings
+aws_access_key_id = settings.aws_access_key_id
+aws_secret_access_key = settings.aws_secret_access_key
+aws_region = settings.aws_region
+bucket_name = settings.s3_form_bucket
+
+# Analyses are keyed by the object's ETag, so re-uploads of identical content reuse them
+ANALYSIS_CACHE_TTL = 24 * 3600
+
 
+class TokenBucket:
+    """Blocking token bucket that spaces calls out to a steady rate with short bursts."""
 
-def extract_text_enhanced(response, extract_by="WORD"):
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+# Keeps batch fan-out under the StartDocumentAnalysis TPS quota instead of retrying throttles
+_start_bucket = TokenBucket(
+    rate=settings.textract_start_rate, capacity=max(1.0, settings.textract_start_rate)
+)
+
+def start_async_textract_analysis(s3_file_name: str) -> str:
     """
-    Extract text from Textract response based on block type.
+    Start an asynchronous Textract document analysis job.
 
     Args:
-        response (dict): Textract response
-        extract_by (str): Block type to extract ('WORD', 'LINE', etc.)
+        s3_file_name (str): The S3 file name (path) of the document to analyze.
 
     Returns:
-        list: Extracted text blocks
+        str: Job ID to track the status of the analysis.
     """
-    line_text = []
-    for block in response["Blocks"]:
-        if block["BlockType"] == extract_by:
-            line_text.append(block["Text"])
-    return line_text
+    params = {}
+    if completion_queue_url:
+        params["NotificationChannel"] = notification_channel
+    _start_bucket.consume()
+    try:
+        response = get_textract_client().start_document_analysis(
+            DocumentLocation={
+                "S3Object": {"Bucket": bucket_name, "Name": s3_file_name}
+            },
+            FeatureTypes=["FORMS", "TABLES"],
+            **params,
+        )
+        return response["JobId"]
+    except (NoCredentialsError, ClientError) as e:
+        raise Exception(f"Could not start Textract analysis -> {e}")
 
 
-def map_word_ids(response):
+def get_async_textract_results(
+    job_id: str,
+    initial: float = 0.5,
+    max_interval: float = 10.0,
+    multiplier: float = 2.0,
+    max_wait: float = JOB_MAX_WAIT,
+) -> dict:
     """
-    Create a mapping of word and selection IDs to their text or status.
+    Retrieve the results of the asynchronous Textract document analysis.
+
+    Polls with exponential backoff and jitter, so short jobs return quickly and
+    long ones don't spend the GetDocumentAnalysis TPS quota on status checks.
 
     Args:
-        response (dict): Textract response
+        job_id (str): The Job ID of the Textract analysis.
+        initial (float): Seconds to wait before the second status check.
+        max_interval (float): Upper bound on the wait between checks.
+        multiplier (float): Growth factor applied to the wait after each check.
+        max_wait (float): Seconds after which the job is given up on.
 
     Returns:
-        dict: Mapping of block IDs to their text or selection status
+        dict: Textract analysis result.
     """
-    word_map = {}
-    for block in response["Blocks"]:
-        if block["BlockType"] == "WORD":
-            word_map[block["Id"]] = block["Text"]
-        if block["BlockType"] == "SELECTION_ELEMENT":
-            word_map[block["Id"]] = block["SelectionStatus"]
-    return word_map
+    delay = initial
+    deadline = time.monotonic() + max_wait
+    try:
+        while True:
+            if time.monotonic() > deadline:
+                raise Exception(f"Timed out waiting for Textract job {job_id}")
+            result = get_textract_client().get_document_analysis(JobId=job_id)
+            status = result["JobStatus"]
+
+            if status == "SUCCEEDED":
+                configured_logger.debug("Textract job %s succeeded.", job_id)
+                return _fetch_all_pages(job_id, result)
+            elif status == "FAILED":
+                configured_logger.error("Textract job %s failed.", job_id)
+                raise Exception("Textract analysis failed.")
+
+            time.sleep(delay + random.uniform(0, delay * 0.1))
+            delay = min(max_interval, delay * multiplier)
+
+    except (NoCredentialsError, ClientError) as e:
+        raise Exception(f"Error fetching Textract results -> {e}")
 
 
-def extract_tables(response, word_map):
+def _fetch_all_pages(job_id: str, result: dict) -> dict:
     """
-    Extract table information from Textract response.
+    Gather the blocks of every result page of a finished Textract job.
 
     Args:
-        response (dict): Textract response
-        word_map (dict): Mapping of word IDs to their text
+        job_id (str): The Job ID of the Textract analysis.
+        result (dict): The first page of the job's results.
 
     Returns:
-        dict: Extracted tables with unique keys
+        dict: The first page with the blocks of all pages combined.
     """
-    tables = {}
-    current_table = []
-    current_row = []
-    current_row_index = 1
-
-    for block in response["Blocks"]:
-        if block["BlockType"] == "TABLE":
-            # Start of a new table
-            table_key = f"table_{uuid.uuid4().hex}"
-            current_table = []
-            current_row = []
-            current_row_index = 1
-
-        if block["BlockType"] == "CELL":
-            # Check if we've moved to a new row
-            if block["RowIndex"] != current_row_index:
-                if current_row:
-                    current_table.append(current_row)
-                current_row = []
-                current_row_index = block["RowIndex"]
-
-            # Extract cell content
-            cell_content = " "
-            if "Relationships" in block:
-                for relation in block["Relationships"]:
-                    if relation["Type"] == "CHILD":
-                        cell_content = " ".join(
-                            [word_map.get(i, "") for i in relation["Ids"]]
-                        )
-
-            current_row.append(cell_content.strip())
-
-            # If this is the last cell in the table, add the last row
-            if block.get("ColumnIndex") == block.get("Columns"):
-                if current_row:
-                    current_table.append(current_row)
-                    tables[table_key] = current_table
-                    current_table = []
-                    current_row = []
-
-    return tables
-
-
-def extract_form_fields_advanced(response, word_map):
+    textract = get_textract_client()
+    blocks = result["Blocks"]
+    next_token = result.get("NextToken")
+    while next_token:
+        page = textract.get_document_analysis(JobId=job_id, NextToken=next_token)
+        blocks.extend(page["Blocks"])
+        next_token = page.get("NextToken")
+    return {**result, "Blocks": blocks}
+
+
+def wait_for_sqs_notification(job_id: str, max_wait: float = JOB_MAX_WAIT) -> dict:
     """
-    Advanced form field extraction from Textract response.
+    Wait for a Textract job's completion notification and fetch its results.
 
     Args:
-        response (dict): Textract response
-        word_map (dict): Mapping of word IDs to their text
+        job_id (str): The Job ID of the Textract analysis.
+        max_wait (float): Seconds to wait before giving up on the job.
 
     Returns:
-        dict: Extracted form fields
+        dict: Textract analysis result.
     """
-    key_map = {}
-    value_map = {}
-    final_map = {}
-
-    # First pass: create key and value maps
-    for block in response["Blocks"]:
-        if block["BlockType"] == "KEY_VALUE_SET":
-            if "KEY" in block.get("EntityTypes", []):
-                # Process key
-                key_text = ""
-                if "Relationships" in block:
-                    for relation in block["Relationships"]:
-                        if relation["Type"] == "CHILD":
-                            key_text = " ".join(
-                                [word_map.get(i, "") for i in relation["Ids"]]
-                            )
-
-                # Find associated value IDs
-                value_ids = []
-                for relation in block.get("Relationships", []):
-                    if relation["Type"] == "VALUE":
-                        value_ids = relation["Ids"]
-
-                if key_text:
-                    key_map[key_text] = value_ids
-
-            elif "VALUE" in block.get("EntityTypes", []):
-                # Process value
-                if "Relationships" in block:
-                    for relation in block["Relationships"]:
-                        if relation["Type"] == "CHILD":
-                            value_text = " ".join(
-                                [word_map.get(i, "") for i in relation["Ids"]]
-                            )
-                            value_map[block["Id"]] = value_text
-
-    # Second pass: combine keys and values
-    for key, value_ids in key_map.items():
-        value_text = " ".join([value_map.get(vid, "N/A") for vid in value_ids])
-        final_map[key] = value_text.strip()
-
-    return final_map
+    if drain_completions([job_id], max_wait=max_wait)[job_id] != "SUCCEEDED":
+        raise Exception("Textract analysis failed.")
+    try:
+        result = get_textract_client().get_document_analysis(JobId=job_id)
+        return _fetch_all_pages(job_id, result)
+    except (NoCredentialsError, ClientError) as e:
+        raise Exception(f"Error fetching Textract results -> {e}")
 
 
-def start_async_textract_analysis(s3_file_name: str) -> str:
+def _analysis_cache_key(s3_file_name: str) -> str:
     """
-    Start an asynchronous Textract document analysis job.
+    Build the cache key for a document's Textract analysis from its S3 ETag.
 
     Args:
-        s3_file_name (str): The S3 file name (path) of the document to analyze.
+        s3_file_name (str): The S3 file name (path) of the document.
 
     Returns:
-        str: Job ID to track the status of the analysis.
+        str: Redis key identifying the object's content.
+    """
+    head = s3.s3.head_object(Bucket=bucket_name, Key=s3_file_name)
+    etag = head["ETag"].strip('"')
+    return f"textract_analysis:{etag}"
+
+
+def _get_cached_analysis(s3_file_name: str):
+    """
+    Look the document's Textract analysis up in Redis.
+
+    Returns:
+        tuple: The cache key, or None if it couldn't be built, and the cached analysis, or
+        None on a miss or if S3 or Redis is unavailable.
     """
     try:
-        response = textract.start_document_analysis(
-            DocumentLocation={
-                "S3Object": {"Bucket": bucket_name, "Name": s3_file_name}
-            },
+        cache_key = _analysis_cache_key(s3_file_name)
+    except Exception as e:
+        configured_logger.warning("Analysis cache key lookup failed for '%s': %s", s3_file_name, e)
+        return None, None
+    try:
+        cached = redis_client.get_cache(cache_key)
+        return cache_key, orjson.loads(cached) if cached else None
+    except Exception as e:
+        configured_logger.warning("Analysis cache lookup failed for '%s': %s", s3_file_name, e)
+        return cache_key, None
+
+
+def _cache_analysis(cache_key, s3_file_name: str, response: dict):
+    """Share an analysis through Redis; failing to is only logged."""
+    if cache_key is None:
+        return
+    try:
+        redis_client.set_cache(cache_key, orjson.dumps(response), ttl=ANALYSIS_CACHE_TTL)
+    except Exception as e:
+        configured_logger.warning("Could not cache Textract analysis for '%s': %s", s3_file_name, e)
+
+
+def _analyze_sync(s3_file_name: str) -> dict:
+    # Single-page documents and images are analyzed in one call
+    try:
+        return get_textract_client().analyze_document(
+            Document={"S3Object": {"Bucket": bucket_name, "Name": s3_file_name}},
             FeatureTypes=["FORMS", "TABLES"],
         )
-        return response["JobId"]
     except (NoCredentialsError, ClientError) as e:
-        raise Exception(f"Could not start Textract analysis -> {e}")
+        raise Exception(f"Could not run Textract analysis -> {e}")
+
+
+def _analyze_async(s3_file_name: str) -> dict:
+    # Multi-page documents need a job, awaited over SQS when configured and by polling otherwise
+    job_id = start_async_textract_analysis(s3_file_name)
+    if completion_queue_url:
+        return wait_for_sqs_notification(job_id)
+    return get_async_textract_results(job_id)
 
 
-def get_async_textract_results(job_id: str) -> dict:
+_ANALYZERS = {"sync": _analyze_sync, "async": _analyze_async}
+
+
+def get_textract_analysis(s3_file_name: str, mode: str = "async") -> dict:
     """
-    Retrieve the results of the asynchronous Textract document analysis.
+    Run Textract analysis on a document, reusing the result for identical content.
 
     Args:
-        job_id (str): The Job ID of the Textract analysis.
+        s3_file_name (str): The S3 file name (path) of the document to analyze.
+        mode (str): "sync" for a single AnalyzeDocument call (images and single-page
+            documents), "async" for an analysis job.
 
     Returns:
         dict: Textract analysis result.
     """
-    try:
-        while True:
-            result = textract.get_document_analysis(JobId=job_id)
-            status = result["JobStatus"]
+    analyze = _ANALYZERS.get(mode)
+    if analyze is None:
+        raise ValueError(f"Unknown Textract analysis mode: {mode}")
 
-            if status == "SUCCEEDED":
-                print("Textract job succeeded.")
-                return result
-            elif status == "FAILED":
-                print("Textract job failed.")
-                raise Exception("Textract analysis failed.")
+    cache_key, cached = _get_cached_analysis(s3_file_name)
+    if cached is not None:
+        configured_logger.info(f"Reusing Textract analysis for {s3_file_name}")
+        return cached
 
-            print("Waiting for job to complete...")
-            time.sleep(5)  # Sleep for 5 seconds before checking again
+    response = analyze(s3_file_name)
 
-    except (NoCredentialsError, ClientError) as e:
-        raise Exception(f"Error fetching Textract results -> {e}")
+    _cache_analysis(cache_key, s3_file_name, response)
+    return response
 
 
-def text_extractor_enhanced(s3_file_name: str) -> str:
+def text_extractor_enhanced(s3_file_name: str, mode: str = "async") -> str:
     """
     Enhanced text extraction using AWS Textract with comprehensive parsing.
 
     Args:
         s3_file_name (str): The S3 file name (path) of the document to analyze.
+        mode (str): "sync" or "async" Textract analysis, see get_textract_analysis.
 
     Returns:
         dict: Comprehensive extraction results
     """
     try:
-        # Start the asynchronous Textract analysis
-        job_id = start_async_textract_analysis(s3_file_name)
-
-        # Get the results once the job is complete
-        response = get_async_textract_results(job_id)
-
-        # Mapping of word IDs to their text/status
-        word_map = map_word_ids(response)
-
-        # Extract different types of information
-        tables = extract_tables(response, word_map)
-        form_fields = extract_form_fields_advanced(response, word_map)
-        lines = extract_text_enhanced(response, "LINE")
-
-        # Format the extracted data as text
-        text_output = []
-
-        # Format form fields
-        text_output.append("Extracted Form Fields:")
-        for key, value in form_fields.items():
-            text_output.append(f"- {key}: {value}")
-
-        # Format tables
-        text_output.append("\nExtracted Tables:")
-        for table_key, table_data in tables.items():
-            text_output.append(f"{table_key}:")
-            for row in table_data:
-                text_output.append(" | ".join(row))
-
-        # Format lines
-        text_output.append("\nExtracted Text Lines:")
-        text_output.extend(lines)
-
-        # Combine all text
-        formatted_text = "\n".join(text_output)
+        # Analyze the document, or reuse the analysis of identical content
+        response = get_textract_analysis(s3_file_name, mode)
+        formatted_text = format_analysis(response)
 
         # Log the extracted data
         configured_logger.info(f"Extracted data from {s3_file_name}")
-        print(formatted_text)
+        if configured_logger.isEnabledFor(logging.DEBUG):
+            configured_logger.debug("Extracted text:\n%s", formatted_text)
 
         return formatted_text
 
@@ -279,6 +294,41 @@ def text_extractor_enhanced(s3_file_name: str) -> str:
         raise Exception(f"Could not extract text using Textract {e}")
 
 
+def text_extractor_batch(
+    s3_file_names: list[str], max_workers: int = 10, mode: str = "async"
+) -> dict:
+    """
+    Run enhanced text extraction on several documents concurrently.
+
+    Each document's Textract job is started and awaited on its own thread, so
+    the jobs run side by side instead of one after another.
+
+    Args:
+        s3_file_names (list[str]): The S3 file names (paths) of the documents.
+        max_workers (int): Maximum number of documents processed at once.
+        mode (str): "sync" or "async" Textract analysis, see get_textract_analysis.
+
+    Returns:
+        dict: Extracted text keyed by S3 file name; None for documents that failed,
+        so one failure doesn't discard the others' results.
+    """
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(text_extractor_enhanced, name, mode): name
+            for name in s3_file_names
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                configured_logger.error(f"Error processing file {name} -> {e}")
+                results[name] = None
+    return results
+
+
 # Example usage
 # if __name__ == "__main__":
 #     result = text_extractor_enhanced("case_registration_form.pdf")
+#     results = text_extractor_batch(["case_registration_form.pdf", "space_mission_form.pdf"])
@@ -0,0 +1,228 @@
+import sys
+from collections import defaultdict
+
+# Words up to this length are interned when building the word map
+INTERN_MAX_WORD_LENGTH = 32
+
+# Shared default for absent EntityTypes/Relationships
+_EMPTY = ()
+
+
+def bucket_blocks(response):
+    """
+    Sort the Textract blocks by type in a single pass over the response.
+
+    Args:
+        response (dict | Iterable[dict]): Textract response, or an iterable of its
+            blocks, e.g. streamed from several result pages
+
+    Returns:
+        dict: Word/selection text by Id, line texts, TABLE blocks, CELL blocks
+        by Id and KEY_VALUE_SET blocks
+    """
+    words = {}
+    selections = {}
+    lines = []
+    tables = []
+    cells = {}
+    kv = []
+    # Bound once: the loop body runs for every block of every page
+    intern = sys.intern
+    add_line = lines.append
+    add_kv = kv.append
+    for block in response["Blocks"] if isinstance(response, dict) else response:
+        bt = block["BlockType"]
+        if bt == "WORD":
+            word_text = block["Text"]
+            # Forms repeat short words across fields and pages; share one copy of each
+            if len(word_text) <= INTERN_MAX_WORD_LENGTH:
+                word_text = intern(word_text)
+            words[block["Id"]] = word_text
+        elif bt == "LINE":
+            add_line(block["Text"])
+        elif bt == "CELL":
+            cells[block["Id"]] = block
+        elif bt == "KEY_VALUE_SET":
+            add_kv(block)
+        elif bt == "SELECTION_ELEMENT":
+            selections[block["Id"]] = intern(block["SelectionStatus"])
+        elif bt == "TABLE":
+            tables.append(block)
+    return {
+        "words": words,
+        "selections": selections,
+        "lines": lines,
+        "tables": tables,
+        "cells": cells,
+        "kv": kv,
+    }
+
+
+def extract_text_enhanced(blocks):
+    """
+    Extract the text lines from bucketed Textract blocks.
+
+    Args:
+        blocks (dict): Output of bucket_blocks
+
+    Returns:
+        list: Extracted text lines
+    """
+    return blocks["lines"]
+
+
+def map_word_ids(blocks):
+    """
+    Create a mapping of word and selection IDs to their text or status.
+
+    Args:
+        blocks (dict): Output of bucket_blocks
+
+    Returns:
+        dict: Mapping of block IDs to their text or selection status
+    """
+    return {**blocks["words"], **blocks["selections"]}
+
+
+def _cell_text(cell, word_map):
+    """Join the text of a CELL block's child words and selection marks."""
+    wm_get = word_map.get
+    for relation in cell.get("Relationships", _EMPTY):
+        if relation["Type"] == "CHILD":
+            return " ".join(text for i in relation["Ids"] if (text := wm_get(i))).strip()
+    return ""
+
+
+def extract_tables(blocks, word_map):
+    """
+    Extract table information from bucketed Textract blocks.
+
+    Cells are placed by their RowIndex/ColumnIndex, so missing or out-of-order
+    cells still land in the right position.
+
+    Args:
+        blocks (dict): Output of bucket_blocks
+        word_map (dict): Mapping of word IDs to their text
+
+    Returns:
+        dict: Extracted tables keyed by their TABLE block Id
+    """
+    tables = {}
+    cells = blocks["cells"]
+
+    for table in blocks["tables"]:
+        rows = defaultdict(dict)
+        max_col = 0
+        for relation in table.get("Relationships", _EMPTY):
+            if relation["Type"] != "CHILD":
+                continue
+            for cell_id in relation["Ids"]:
+                cell = cells.get(cell_id)
+                if cell is None:
+                    continue
+                col = cell["ColumnIndex"]
+                rows[cell["RowIndex"]][col] = _cell_text(cell, word_map)
+                if col > max_col:
+                    max_col = col
+
+        if rows:
+            table_key = f"table_{table['Id']}"
+            tables[table_key] = [
+                [rows[r].get(c, "") for c in range(1, max_col + 1)]
+                for r in sorted(rows)
+            ]
+
+    return tables
+
+
+def extract_form_fields_advanced(blocks, word_map):
+    """
+    Advanced form field extraction from bucketed Textract blocks.
+
+    Args:
+        blocks (dict): Output of bucket_blocks
+        word_map (dict): Mapping of word IDs to their text
+
+    Returns:
+        dict: Extracted form fields
+    """
+    key_map = {}
+    value_map = {}
+    final_map = {}
+    wm_get = word_map.get
+
+    # First pass: create key and value maps
+    for block in blocks["kv"]:
+        entity_types = block.get("EntityTypes", _EMPTY)
+        relationships = block.get("Relationships", _EMPTY)
+        if "KEY" in entity_types:
+            # Process key text and its associated value IDs in one scan
+            key_text = ""
+            value_ids = _EMPTY
+            for relation in relationships:
+                if relation["Type"] == "CHILD":
+                    key_text = " ".join(text for i in relation["Ids"] if (text := wm_get(i)))
+                elif relation["Type"] == "VALUE":
+                    value_ids = relation["Ids"]
+
+            if key_text:
+                key_map[key_text] = value_ids
+
+        elif "VALUE" in entity_types:
+            # Process value
+            for relation in relationships:
+                if relation["Type"] == "CHILD":
+                    value_text = " ".join(text for i in relation["Ids"] if (text := wm_get(i)))
+                    value_map[block["Id"]] = value_text
+
+    # Second pass: combine keys and values
+    vm_get = value_map.get
+    for key, value_ids in key_map.items():
+        value_text = " ".join(vm_get(vid, "N/A") for vid in value_ids)
+        final_map[key] = value_text.strip()
+
+    return final_map
+
+
+def format_analysis(response) -> str:
+    """
+    Format a Textract document analysis as the text passed on to the LLM.
+
+    Args:
+        response (dict): Textract response with FORMS and TABLES analysis
+
+    Returns:
+        str: Form fields, tables and text lines as plain text
+    """
+    # Sort the blocks by type once, then each parser reads only its own
+    blocks = bucket_blocks(response)
+
+    # Mapping of word IDs to their text/status
+    word_map = map_word_ids(blocks)
+
+    # Extract different types of information
+    tables = extract_tables(blocks, word_map)
+    form_fields = extract_form_fields_advanced(blocks, word_map)
+    lines = extract_text_enhanced(blocks)
+
+    # Format the extracted data as text
+    text_output = []
+
+    # Format form fields
+    text_output.append("Extracted Form Fields:")
+    for key, value in form_fields.items():
+        text_output.append(f"- {key}: {value}")
+
+    # Format tables
+    text_output.append("\nExtracted Tables:")
+    for table_key, table_data in tables.items():
+        text_output.append(f"{table_key}:")
+        for row in table_data:
+            text_output.append(" | ".join(row))
+
+    # Format lines
+    text_output.append("\nExtracted Text Lines:")
+    text_output.extend(lines)
+
+    # Combine all text
+    return "\n".join(text_output)
@@ -1,9 +1,11 @@
+import hashlib
 import json
 from datetime import datetime
 from pydantic import BaseModel, ValidationError
-import hashlib
+from blake3 import blake3
+from config import settings
+from logger import configured_logger
 import re
-import os
 
 class CustomJSONEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -14,14 +16,52 @@ class CustomJSONEncoder(json.JSONEncoder):
         return super().default(obj)
 
 
+# Content hash used for deduplication; BLAKE3 hashes large files on several cores
+FILE_HASH_ALGO = settings.file_hash_algo.lower()
+if FILE_HASH_ALGO != "blake3":
+    hashlib.new(FILE_HASH_ALGO)  # Fail at startup on an unknown algorithm name
+
+
+def _new_hasher():
+    if FILE_HASH_ALGO == "blake3":
+        return blake3(max_threads=blake3.AUTO)
+    return hashlib.new(FILE_HASH_ALGO)
+
+
 def get_file_hash(file_content: bytes) -> str:
     """
-    Computes the SHA-256 hash of the file content.
+    Computes the FILE_HASH_ALGO hash of the file content.
     """
-    return hashlib.sha256(file_content).hexdigest()
+    hasher = _new_hasher()
+    hasher.update(file_content)
+    return hasher.hexdigest()
+
+
+def get_file_hash_stream(fileobj, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Computes the FILE_HASH_ALGO hash of a binary file-like object in chunks and rewinds it.
+
+    Memory use is one chunk whatever the file size; the chunk buffer is reused
+    when the object supports readinto.
+    """
+    hasher = _new_hasher()
+    if hasattr(fileobj, "readinto"):
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
+        while size := fileobj.readinto(buffer):
+            hasher.update(view[:size])
+    else:
+        for chunk in iter(lambda: fileobj.read(chunk_size), b""):
+            hasher.update(chunk)
+    fileobj.seek(0)
+    return hasher.hexdigest()
+
 
+# Stored without the leading dot, as split off by is_valid_filename
+ALLOWED_EXTENSIONS = frozenset({'pdf', 'docx', 'txt', 'jpg', 'jpeg', 'png'})
 
-ALLOWED_EXTENSIONS = {'.pdf', '.docx', '.txt', '.jpg', '.jpeg', '.png'}
+# Letters, numbers, underscores, hyphens and periods only; \Z also rejects a trailing newline
+_FILENAME_RE = re.compile(r'^[A-Za-z0-9_.\-]+\Z')
 
 def is_valid_filename(file_name: str) -> bool:
     """
@@ -34,20 +74,20 @@ def is_valid_filename(file_name: str) -> bool:
         bool: True if the filename is valid, False otherwise.
     """
     # Check for valid file extension
-    _, file_extension = os.path.splitext(file_name)
-    if file_extension.lower() not in ALLOWED_EXTENSIONS:
-        print(f"Invalid file extension: {file_extension}")
+    stem, sep, file_extension = file_name.rpartition('.')
+    # A name that is only an extension (".pdf") has no stem and is rejected, as before
+    if not stem or file_extension.lower() not in ALLOWED_EXTENSIONS:
+        configured_logger.debug("Invalid file extension: %s", sep + file_extension)
         return False
 
     # Check if the filename is too long (limit to 255 characters)
     if len(file_name) > 255:
-        print("Filename is too long. Max length is 255 characters.")
+        configured_logger.debug("Filename is too long. Max length is 255 characters.")
         return False
 
     # Ensure the filename doesn't contain invalid characters
-    # Allow letters, numbers, underscores, hyphens, and periods only
-    if not re.match(r'^[a-zA-Z0-9_\-\.]+$', file_name):
-        print(f"Invalid characters in filename: {file_name}")
+    if not _FILENAME_RE.match(file_name):
+        configured_logger.debug("Invalid characters in filename: %s", file_name)
         return False
 
     return True